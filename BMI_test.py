@@ -1,9 +1,11 @@
 from spi_funcs import SPI_DEVICE
+from bmi323 import BMI323, BMI323_SPI
+import numpy as np
 import time
 
 # SPI Configuration
 SPI_BUS = 0  # Typically 0 for Raspberry Pi, adjust for other platforms
-BMI323_CS = 8  # Set to the correct SPI device (CS line)
+BMI323_CS = None  # GPIO8 is CE0 itself, so let the SPI controller drive CS
 CHIP_ID_REG = 0x00  # Register address for CHIP_ID
 
 
@@ -13,6 +15,16 @@ def main():
         print(response)
         #print(f"CHIP_ID: 0x{chip_id:02X}")
 
+        imu = BMI323(BMI323_SPI(spi))
+        imu.setup()
+        imu.start_fifo(400)
+        time.sleep(0.1)
+        t, samples = imu.read_fifo()
+        print(f"FIFO: {len(samples)} samples at {imu.fifo_rate:.0f} Hz")
+        if len(samples):
+            print(f"  last: {np.round(samples[-1], 3)}")
+        imu.stop_fifo()
+
 
 if __name__ == "__main__":
     main()
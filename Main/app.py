@@ -8,12 +8,19 @@ import math
 import json
 import threading
 from collections import deque
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, NamedTuple
 
+import numpy as np
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 
+# shared sensor drivers live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp3008 import MCP3008
+from metrics import Metrics, PROMETHEUS_CONTENT_TYPE
+import calibration_store
+
 # --------------------------------------------------
 # Config
 # --------------------------------------------------
@@ -22,8 +29,8 @@ HOST = os.environ.get("ASL_HOST", "0.0.0.0")
 PORT = int(os.environ.get("ASL_PORT", "5000"))
 CORS_ORIGINS = os.environ.get("ASL_CORS_ORIGINS", "*")
 
-SAMPLE_HZ = 30.0           # sensor read frequency
-BUFFER_SECONDS = 2.0       # ring buffer duration
+SAMPLE_HZ = float(os.environ.get("ASL_SAMPLE_HZ", "30"))  # sensor read frequency
+BUFFER_SECONDS = float(os.environ.get("ASL_BUFFER_SECONDS", "2.0"))  # ring buffer duration
 TRANSLATE_VOTE_MS = 300    # vote window for translate mode
 TRANSLATE_MIN_CONF = 0.60  # min vote ratio to emit letter change
 PRACTICE_DEFAULT_MS = 5000 # hold duration for practice
@@ -35,6 +42,10 @@ SPI_BUS = 0
 SPI_DEV = 0
 SPI_MAX_HZ = 1_000_000
 FLEX_CHANNELS = [0, 1, 2, 3, 4]  # thumb..pinky
+FLEX_OVERSAMPLE = int(os.environ.get("ASL_FLEX_OVERSAMPLE", "1"))  # conversions averaged per channel
+
+# IMU: "mpu6050" or "bmi323" (both on I2C bus 1)
+IMU_SENSOR = os.environ.get("ASL_IMU", "mpu6050").lower()
 
 # MPU-6050 registers
 MPU6050_ADDR = 0x68
@@ -44,9 +55,25 @@ GYRO_XOUT_H  = 0x43
 ACCEL_SF = 16384.0   # accel scale factor
 GYRO_SF  = 131.0     # gyro scale factor (deg/s)
 CALIBRATION_TIME = 1.0  # seconds
+CALIBRATION_PATH = os.environ.get("ASL_CALIBRATION_PATH", calibration_store.CALIBRATION_PATH)
+IMU_FIFO_HZ = float(os.environ.get("ASL_IMU_FIFO_HZ", "0"))  # >0: stream from the MPU FIFO at this rate
 
 ALPHA = 0.98  # complementary filter coefficient
 
+# --------------------------------------------------
+# Instrumentation
+# --------------------------------------------------
+METRICS = Metrics()
+T_SPI = METRICS.histogram("spi_read_seconds", "MCP3008 flex burst read")
+T_I2C = METRICS.histogram("i2c_read_seconds", "IMU block or FIFO read")
+T_FILTER = METRICS.histogram("filter_update_seconds", "Complementary filter update for one read_imu call")
+T_CLASSIFY = METRICS.histogram("classify_seconds", "Range classification of each batch of new frames")
+T_EMIT = METRICS.histogram("emit_seconds", "One socketio.emit call")
+# jitter: buckets are fractions of the target period
+T_INTERVAL = METRICS.histogram(
+    "sample_interval_seconds", "Measured time between acquisitions",
+    buckets=[f / SAMPLE_HZ for f in (0.5, 0.8, 0.9, 0.95, 0.98, 1.02, 1.05, 1.1, 1.2, 1.5, 2.0, 5.0)])
+
 # --------------------------------------------------
 # Pi / Dev detection & hardware init
 # --------------------------------------------------
@@ -54,6 +81,8 @@ IS_PI = sys.platform.startswith("linux")
 
 spi = None
 bus = None
+flex_adc = None
+imu_dev = None
 
 if IS_PI:
     try:
@@ -65,17 +94,23 @@ if IS_PI:
         spi.open(SPI_BUS, SPI_DEV)
         spi.max_speed_hz = SPI_MAX_HZ
         spi.mode = 0b00
+        flex_adc = MCP3008(spi, FLEX_CHANNELS, oversample=FLEX_OVERSAMPLE)
 
-        # I2C for MPU6050
+        # I2C for the IMU
         bus = smbus2.SMBus(1)
+        if IMU_SENSOR == "bmi323":
+            from bmi323 import BMI323, BMI323_I2C
+            imu_dev = BMI323(BMI323_I2C(bus))
+        else:
+            from mpu6050 import MPU6050
+            imu_dev = MPU6050(bus, MPU6050_ADDR, ACCEL_SF, GYRO_SF)
     except Exception as e:
         print(f"[WARN] Hardware init failed, falling back to mock sensors: {e}")
         spi = None
         bus = None
+        flex_adc = None
+        imu_dev = None
         IS_PI = False
-else:
-    spi = None
-    bus = None
 
 # --------------------------------------------------
 # MCP3008 helpers
@@ -95,87 +130,80 @@ def read_mcp3008_single(ch: int) -> int:
     return ((resp[1] & 0x03) << 8) | resp[2]
 
 def read_flex_all() -> List[int]:
-    return [read_mcp3008_single(ch) for ch in FLEX_CHANNELS]
+    """All FLEX_CHANNELS in one SPI burst (mocked per channel off the Pi)."""
+    if flex_adc is None:
+        return [read_mcp3008_single(ch) for ch in FLEX_CHANNELS]
+    return flex_adc.read()
 
 # --------------------------------------------------
 # MPU6050 helpers + complementary filter
 # --------------------------------------------------
 def mpu_setup():
-    global bus
-    if bus is None:
+    if imu_dev is None:
         return
-    bus.write_byte_data(MPU6050_ADDR, PWR_MGMT_1, 0x00)
-    time.sleep(0.05)
-
-def mpu_read_word(reg: int) -> int:
-    hi = bus.read_byte_data(MPU6050_ADDR, reg)
-    lo = bus.read_byte_data(MPU6050_ADDR, reg + 1)
-    val = (hi << 8) | lo
-    if val > 32767:
-        val -= 65536
-    return val
-
-def accel_to_angles(ax_g: float, ay_g: float, az_g: float) -> Tuple[float, float]:
-    # roll and pitch from accelerometer (deg)
-    roll  = math.degrees(math.atan2(ay_g, az_g if abs(az_g) > 1e-8 else 1e-8))
-    pitch = math.degrees(math.atan2(-ax_g, math.sqrt(ay_g * ay_g + az_g * az_g)))
-    return roll, pitch
+    imu_dev.setup()
+
+accel_to_angles = calibration_store.accel_to_angles  # roll and pitch from accelerometer (deg)
 
 def calibrate_imu() -> Tuple[Tuple[float,float,float], Tuple[float,float]]:
     """
-    Calibrate gyro bias and initial roll/pitch.
+    Gyro bias and initial roll/pitch: the stored calibration when it is still
+    valid (no hold-still on restart), otherwise measured and stored.
     Returns ((bx,by,bz), (roll0, pitch0)).
     """
-    global bus
-    if bus is None:
+    global imu_refiner
+    if imu_dev is None:
         return (0.0, 0.0, 0.0), (0.0, 0.0)
 
-    print("Calibrating IMU... keep the glove steady")
-    t_end = time.time() + CALIBRATION_TIME
-    gx_sum = gy_sum = gz_sum = 0.0
-    ax_sum = ay_sum = az_sum = 0.0
-    n = 0
-    while time.time() < t_end:
-        ax = mpu_read_word(ACCEL_XOUT_H) / ACCEL_SF
-        ay = mpu_read_word(ACCEL_XOUT_H + 2) / ACCEL_SF
-        az = mpu_read_word(ACCEL_XOUT_H + 4) / ACCEL_SF
-        gx = mpu_read_word(GYRO_XOUT_H) / GYRO_SF
-        gy = mpu_read_word(GYRO_XOUT_H + 2) / GYRO_SF
-        gz = mpu_read_word(GYRO_XOUT_H + 4) / GYRO_SF
-        ax_sum += ax; ay_sum += ay; az_sum += az
-        gx_sum += gx; gy_sum += gy; gz_sum += gz
-        n += 1
-        time.sleep(0.002)
-
-    if n == 0:
-        n = 1
-
-    bx = gx_sum / n
-    by = gy_sum / n
-    bz = gz_sum / n
-
-    ax0 = ax_sum / n
-    ay0 = ay_sum / n
-    az0 = az_sum / n
-    r0, p0 = accel_to_angles(ax0, ay0, az0)
-
-    print("Calibration done.")
-    return (bx, by, bz), (r0, p0)
+    cal, _ = calibration_store.load_or_measure(imu_dev, CALIBRATION_TIME, CALIBRATION_PATH)
+    imu_refiner = calibration_store.BiasRefiner(
+        cal, CALIBRATION_PATH, read_temp=lambda: calibration_store.current_temp(imu_dev))
+    return cal.bias, (cal.roll, cal.pitch)
 
 # IMU state
 imu_initialized = False
 gx_bias = gy_bias = gz_bias = 0.0
+imu_refiner = None  # calibration_store.BiasRefiner, created by calibrate_imu()
 roll = pitch = yaw = 0.0
 imu_last_t = None
+imu_last: Dict[str, float] = None
+
+def imu_filter_step(ax: float, ay: float, az: float,
+                    gx: float, gy: float, gz: float, dt: float) -> Dict[str, float]:
+    """Advance the complementary filter by one bias-corrected sample."""
+    global roll, pitch, yaw
+
+    # Integrate gyro
+    roll_g  = roll  + gx * dt
+    pitch_g = pitch + gy * dt
+    yaw_g   = yaw   + gz * dt  # basic integration for yaw
+
+    # From accel
+    roll_acc, pitch_acc = accel_to_angles(ax, ay, az)
+
+    # Complementary filter for roll/pitch
+    roll  = ALPHA * roll_g  + (1.0 - ALPHA) * roll_acc
+    pitch = ALPHA * pitch_g + (1.0 - ALPHA) * pitch_acc
+    yaw   = yaw_g  # we do not correct yaw with accel
+
+    return {
+        "roll": roll,
+        "pitch": pitch,
+        "yaw": yaw,
+        "gx": gx, "gy": gy, "gz": gz,
+        "ax": ax, "ay": ay, "az": az
+    }
 
 def read_imu() -> Dict[str, float]:
     """
     Returns roll, pitch, yaw, gx, gy, gz, ax, ay, az.
     Uses complementary filter as in your data collection script.
+    With IMU_FIFO_HZ set, every sample queued in the hardware FIFO since the
+    last call is filtered at the hardware period and the newest is returned.
     """
-    global imu_initialized, gx_bias, gy_bias, gz_bias, roll, pitch, yaw, imu_last_t, bus
+    global imu_initialized, gx_bias, gy_bias, gz_bias, roll, pitch, yaw, imu_last_t, imu_last
 
-    if bus is None:
+    if imu_dev is None:
         # dev/mock mode
         return {
             "roll": 0.0, "pitch": 0.0, "yaw": 0.0,
@@ -188,51 +216,38 @@ def read_imu() -> Dict[str, float]:
         (gx_bias, gy_bias, gz_bias), (roll0, pitch0) = calibrate_imu()
         roll, pitch, yaw = roll0, pitch0, 0.0
         imu_last_t = time.perf_counter()
+        if IMU_FIFO_HZ > 0:
+            imu_dev.start_fifo(IMU_FIFO_HZ)
         imu_initialized = True
 
-    # Read raw
-    ax = mpu_read_word(ACCEL_XOUT_H) / ACCEL_SF
-    ay = mpu_read_word(ACCEL_XOUT_H + 2) / ACCEL_SF
-    az = mpu_read_word(ACCEL_XOUT_H + 4) / ACCEL_SF
-    gx = mpu_read_word(GYRO_XOUT_H) / GYRO_SF - gx_bias
-    gy = mpu_read_word(GYRO_XOUT_H + 2) / GYRO_SF - gy_bias
-    gz = mpu_read_word(GYRO_XOUT_H + 4) / GYRO_SF - gz_bias
+    if IMU_FIFO_HZ > 0:
+        with T_I2C.time():
+            _, samples = imu_dev.read_fifo()
+        dt = 1.0 / imu_dev.fifo_rate
+        with T_FILTER.time():
+            for ax, ay, az, gx, gy, gz in samples.tolist():
+                imu_last = imu_filter_step(ax, ay, az, gx - gx_bias, gy - gy_bias, gz - gz_bias, dt)
+            refined = imu_refiner.observe_block(samples)
+            if refined is not None:
+                gx_bias, gy_bias, gz_bias = refined
+        if imu_last is not None:
+            return imu_last
+
+    # Read raw (one 14-byte block)
+    with T_I2C.time():
+        ax, ay, az, gx, gy, gz = imu_dev.read()
 
     # dt
     t_now = time.perf_counter()
     dt = t_now - imu_last_t if imu_last_t is not None else 1.0 / SAMPLE_HZ
     imu_last_t = t_now
 
-    # Integrate gyro
-    roll_g  = roll  + gx * dt
-    pitch_g = pitch + gy * dt
-    yaw_g   = yaw   + gz * dt  # basic integration for yaw
-
-    # From accel
-    roll_acc, pitch_acc = accel_to_angles(ax, ay, az)
-
-    # Complementary filter for roll/pitch
-    roll_new  = ALPHA * roll_g  + (1.0 - ALPHA) * roll_acc
-    pitch_new = ALPHA * pitch_g + (1.0 - ALPHA) * pitch_acc
-    yaw_new   = yaw_g  # we do not correct yaw with accel
-
-    # update globals
-    roll_val  = roll_new
-    pitch_val = pitch_new
-    yaw_val   = yaw_new
-
-    # store back
-    globals()["roll"] = roll_val
-    globals()["pitch"] = pitch_val
-    globals()["yaw"] = yaw_val
-
-    return {
-        "roll": roll_val,
-        "pitch": pitch_val,
-        "yaw": yaw_val,
-        "gx": gx, "gy": gy, "gz": gz,
-        "ax": ax, "ay": ay, "az": az
-    }
+    with T_FILTER.time():
+        imu_last = imu_filter_step(ax, ay, az, gx - gx_bias, gy - gy_bias, gz - gz_bias, dt)
+        refined = imu_refiner.observe((ax, ay, az, gx, gy, gz))
+        if refined is not None:
+            gx_bias, gy_bias, gz_bias = refined
+    return imu_last
 
 # --------------------------------------------------
 # Ranges loading
@@ -260,58 +275,96 @@ except Exception as e:
 
 LETTERS = sorted(RANGES.keys())
 
+# --------------------------------------------------
+# Compiled range matrices
+# --------------------------------------------------
+# Feature order used by every vectorized path: flex0..flex4 then IMU_KEYS.
+FEATURE_KEYS = tuple(f"flex{i}" for i in range(5)) + IMU_KEYS
+N_FLEX = 5
+N_FEATURES = len(FEATURE_KEYS)
+MIN_LETTER_CONF = 0.55
+
+class CompiledRanges(NamedTuple):
+    letters: List[str]
+    index: Dict[str, int]
+    lo: np.ndarray      # (letters x features)
+    hi: np.ndarray      # (letters x features)
+    w: np.ndarray       # (letters x features)
+    w_total: np.ndarray # (letters,)
+
+def compile_ranges(ranges: Dict[str, Any]) -> CompiledRanges:
+    """Pack the RANGES dict into lo/hi/weight matrices, one row per letter."""
+    letters = sorted(ranges.keys())
+    n = len(letters)
+    lo = np.zeros((n, N_FEATURES), dtype=np.float32)
+    hi = np.zeros((n, N_FEATURES), dtype=np.float32)
+    w = np.empty((n, N_FEATURES), dtype=np.float32)
+    for row, letter in enumerate(letters):
+        feats = ranges[letter]
+        for col, k in enumerate(FEATURE_KEYS):
+            lo[row, col], hi[row, col] = feats[k][0], feats[k][1]
+        w[row, :N_FLEX] = WEIGHTS["flex"]
+        w[row, N_FLEX:] = 1.0 if letter in IMU_BOOST_LETTERS else WEIGHTS["imu"]
+    return CompiledRanges(letters, {l: i for i, l in enumerate(letters)},
+                          lo, hi, w, w.sum(axis=1))
+
+# Swapped as a whole on reload so readers never see a half-built set.
+COMPILED = compile_ranges(RANGES)
+
+def frame_vector(frame: Dict[str, Any]) -> np.ndarray:
+    """Flatten a {"flex": [...], "imu": {...}} frame into FEATURE_KEYS order."""
+    imu = frame["imu"]
+    return np.array([*frame["flex"][:N_FLEX], *(imu[k] for k in IMU_KEYS)], dtype=np.float32)
+
+def as_features(frame) -> np.ndarray:
+    return frame if isinstance(frame, np.ndarray) else frame_vector(frame)
+
 # --------------------------------------------------
 # Scoring / classification
 # --------------------------------------------------
-def in_range(val: float, lohi: List[float]) -> bool:
-    return lohi[0] <= val <= lohi[1]
+def score_frames(x: np.ndarray, compiled: CompiledRanges = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score one frame (features,) or a batch (frames x features) against every letter.
+    Returns (conf, flex_hits): conf is (..., letters), flex_hits is bool (..., letters, 5).
+    """
+    c = compiled if compiled is not None else COMPILED
+    x = np.asarray(x, dtype=np.float32)[..., None, :]
+    hits = (x >= c.lo) & (x <= c.hi)
+    conf = (hits * c.w).sum(axis=-1) / c.w_total
+    return conf, hits[..., :N_FLEX]
 
-def frame_score_for_letter(frame: Dict[str, Any], letter: str) -> Tuple[float, List[int]]:
+def frame_score_for_letter(frame, letter: str) -> Tuple[float, List[int]]:
     """Return (confidence 0..1, per_flex list) comparing frame against a letter's ranges."""
-    feats = RANGES.get(letter)
-    if not feats:
+    c = COMPILED
+    row = c.index.get(letter)
+    if row is None:
         return 0.0, [0,0,0,0,0]
-
-    flex = frame["flex"]
-    imu = frame["imu"]
-
-    flex_w = WEIGHTS["flex"]
-    imu_w = WEIGHTS["imu"]
-    if letter in IMU_BOOST_LETTERS:
-        imu_w = 1.0
-
-    score = 0.0
-    total = 0.0
-    per_flex = []
-
-    # flex sensors
-    for i in range(5):
-        total += flex_w
-        ok = in_range(flex[i], feats[f"flex{i}"])
-        if ok:
-            score += flex_w
-        per_flex.append(1 if ok else 0)
-
-    # IMU
-    for k in IMU_KEYS:
-        total += imu_w
-        if in_range(imu[k], feats[k]):
-            score += imu_w
-
-    conf = score / total if total else 0.0
-    return conf, per_flex
-
-def best_letter_for_frame(frame: Dict[str, Any]) -> Tuple[str, float]:
-    best_letter = None
-    best_conf = -1.0
-    for letter in LETTERS:
-        conf, _ = frame_score_for_letter(frame, letter)
-        if conf > best_conf:
-            best_conf = conf
-            best_letter = letter
-    if best_conf < 0.55:
+    x = as_features(frame)
+    hits = (x >= c.lo[row]) & (x <= c.hi[row])
+    conf = float(np.dot(hits, c.w[row]) / c.w_total[row])
+    return conf, hits[:N_FLEX].astype(int).tolist()
+
+def best_letters_for_frames(x: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """Batch version of best_letter_for_frame for a (frames x features) array."""
+    c = COMPILED
+    if not c.letters:
+        return [None] * len(x), np.zeros(len(x), dtype=np.float32)
+    conf, _ = score_frames(x, c)
+    best = conf.argmax(axis=1)
+    best_conf = conf[np.arange(len(best)), best]
+    letters = [c.letters[i] if bc >= MIN_LETTER_CONF else None for i, bc in zip(best, best_conf)]
+    return letters, np.where(best_conf >= MIN_LETTER_CONF, best_conf, 0.0)
+
+def best_letter_for_frame(frame) -> Tuple[str, float]:
+    c = COMPILED
+    if not c.letters:
+        return None, 0.0
+    conf, _ = score_frames(as_features(frame), c)
+    best = int(conf.argmax())
+    best_conf = float(conf[best])
+    if best_conf < MIN_LETTER_CONF:
         return None, 0.0
-    return best_letter, best_conf
+    return c.letters[best], best_conf
 
 # --------------------------------------------------
 # Flask + Socket.IO
@@ -320,81 +373,265 @@ app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": CORS_ORIGINS}})
 socketio = SocketIO(app, cors_allowed_origins=CORS_ORIGINS, async_mode="threading")
 
+class FrameRing:
+    """
+    Preallocated ring of (t, features) rows for a single writer.
+
+    Every row is written twice, at slot i and i + capacity, so the newest
+    `capacity` rows are always one contiguous slice and readers get views
+    without copying or wrapping. `count` is bumped only after both copies
+    are written, which is what lets readers skip the lock. Readers see at
+    most capacity - 1 rows, so the slot the writer fills next (row `count`)
+    is never part of a view. Views alias the live storage: a view of the
+    newest k rows stays valid for the next capacity - k appends, counting
+    one that may already be in progress; copy anything that must live longer.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.t = np.zeros(2 * capacity, dtype=np.float64)
+        self.x = np.zeros((2 * capacity, N_FEATURES), dtype=np.float32)
+        self.count = 0  # total rows ever appended
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity - 1)
+
+    def append(self, t: float, x: np.ndarray) -> None:
+        n = self.count
+        i = n % self.capacity
+        j = i + self.capacity
+        self.t[i] = self.t[j] = t
+        self.x[i] = self.x[j] = x
+        self.count = n + 1
+
+    def last(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of the newest n rows (oldest first), at most capacity - 1."""
+        count = self.count
+        n = min(n, count, self.capacity - 1)
+        start = (count - n) % self.capacity
+        return self.t[start:start + n], self.x[start:start + n]
+
+    def since(self, seq: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Views of rows appended since sequence number `seq`, plus the new sequence number.
+        Rows already overwritten (a reader more than capacity - 1 behind) are counted as dropped.
+        """
+        count = self.count
+        skipped = count - seq - (self.capacity - 1)
+        if skipped > 0:
+            METRICS.inc("dropped", skipped, help_text="Buffered frames overwritten before a reader got to them")
+        t, x = self.last(count - seq)
+        return t, x, count
+
+    def window(self, t0: float, t1: float = math.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of buffered rows with t0 <= t <= t1."""
+        t, x = self.last(self.capacity - 1)
+        lo = int(np.searchsorted(t, t0, side="left"))
+        hi = int(np.searchsorted(t, t1, side="right"))
+        return t[lo:hi], x[lo:hi]
+
+    def latest(self) -> Tuple[float, np.ndarray]:
+        t, x = self.last(1)
+        if not len(t):
+            return None, None
+        return float(t[0]), x[0].copy()
+
+    def latest_frame(self) -> Dict[str, Any]:
+        t, x = self.latest()
+        return None if x is None else row_to_frame(t, x)
+
+def row_to_frame(t: float, x: np.ndarray) -> Dict[str, Any]:
+    """Dict view of one buffered row, shaped like read_one_frame()."""
+    vals = x.tolist()
+    return {
+        "t": t,
+        "flex": [round(v) for v in vals[:N_FLEX]],  # ADC counts, as read_flex_all() returns them
+        "imu": dict(zip(IMU_KEYS, vals[N_FLEX:]))
+    }
+
 # ring buffer of recent frames
-BUFFER: deque = deque(maxlen=int(SAMPLE_HZ * BUFFER_SECONDS) + 4)
-buffer_lock = threading.Lock()
+BUFFER = FrameRing(int(SAMPLE_HZ * BUFFER_SECONDS) + 4)
 last_letter_emitted = None
 
 def read_one_frame() -> Dict[str, Any]:
+    t = time.time()
+    with T_SPI.time():
+        flex = read_flex_all()
     return {
-        "t": time.time(),
-        "flex": read_flex_all(),
+        "t": t,
+        "flex": flex,
         "imu": read_imu()
     }
 
-def majority_in_window(now: float, ms: int) -> Tuple[str, float]:
-    cutoff = now - ms / 1000.0
-    with buffer_lock:
-        frames = [f for f in list(BUFFER) if f["t"] >= cutoff]
-    votes = {}
-    total = 0
-    for f in frames:
-        letter, _ = best_letter_for_frame(f)
+def timed_emit(event: str, payload: Dict[str, Any]) -> None:
+    t0 = time.perf_counter()
+    socketio.emit(event, payload)
+    T_EMIT.observe(time.perf_counter() - t0)
+
+class VoteWindow:
+    """
+    Sliding majority vote over recently classified frames.
+    Each frame is classified once by the caller and pushed with its letter;
+    per-letter counts are kept incrementally and expired frames are popped
+    from the old end, so a tick costs O(letters) instead of O(window).
+    """
+
+    def __init__(self):
+        self.frames: deque = deque()  # (t, letter or None), oldest first
+        self.votes: Dict[str, int] = {}
+        self.total = 0
+
+    def push(self, t: float, letter: str) -> None:
+        self.frames.append((t, letter))
         if letter:
-            votes[letter] = votes.get(letter, 0) + 1
-            total += 1
-    if not total:
-        return None, 0.0
-    winner = max(votes, key=votes.get)
-    ratio = votes[winner] / total
-    return winner, ratio
+            self.votes[letter] = self.votes.get(letter, 0) + 1
+            self.total += 1
+
+    def evict(self, cutoff: float) -> None:
+        frames = self.frames
+        while frames and frames[0][0] < cutoff:
+            _, letter = frames.popleft()
+            if letter:
+                n = self.votes[letter] - 1
+                if n:
+                    self.votes[letter] = n
+                else:
+                    del self.votes[letter]
+                self.total -= 1
+
+    def result(self) -> Tuple[str, float]:
+        if not self.total:
+            return None, 0.0
+        winner = max(self.votes, key=self.votes.get)
+        return winner, self.votes[winner] / self.total
+
+VOTES = VoteWindow()
 
-def sensor_loop():
-    global last_letter_emitted
-    interval = 1.0 / SAMPLE_HZ
-    last_raw_emit = 0.0
+def majority_in_window(now: float, ms: int) -> Tuple[str, float]:
+    VOTES.evict(now - ms / 1000.0)
+    return VOTES.result()
+
+# --------------------------------------------------
+# Acquisition (producer) and consumers
+# --------------------------------------------------
+ACQ_PRIORITY = int(os.environ.get("ASL_ACQ_PRIORITY", "10"))  # SCHED_FIFO priority, 0 = leave as is
+RAW_EMIT_HZ = 10.0
+STATUS_EMIT_HZ = 1.0
+
+new_frames = threading.Event()
+acq_interval_s = 0.0  # smoothed measured sample interval
+
+def raise_thread_priority(priority: int) -> None:
+    """Best effort: put the calling thread on SCHED_FIFO (needs CAP_SYS_NICE)."""
+    if priority <= 0 or not hasattr(os, "sched_setscheduler"):
+        return
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (PermissionError, OSError) as e:
+        print(f"[WARN] Could not raise acquisition priority: {e}")
+
+def acquisition_loop():
+    """
+    Read sensors into BUFFER on an absolute schedule. Deadlines advance by
+    exactly one period, so time spent reading does not stretch the period;
+    if we fall more than a period behind, the missed slots are skipped and
+    counted rather than read back-to-back.
+    """
+    global acq_interval_s
+    raise_thread_priority(ACQ_PRIORITY)
+    period = 1.0 / SAMPLE_HZ
+    deadline = time.perf_counter()
+    last_t = None
     while True:
         frame = read_one_frame()
-        now = frame["t"]
+        t_read = time.perf_counter()
+        BUFFER.append(frame["t"], frame_vector(frame))
+        new_frames.set()
+
+        METRICS.inc("samples", help_text="Frames written to the buffer")
+        if last_t is not None:
+            dt = t_read - last_t
+            T_INTERVAL.observe(dt)
+            acq_interval_s = acq_interval_s + 0.05 * (dt - acq_interval_s) if acq_interval_s else dt
+        last_t = t_read
+
+        deadline += period
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+            continue
+        METRICS.inc("overruns", help_text="Acquisitions that finished after their deadline")
+        if -delay > period:
+            skipped = int(-delay // period)
+            METRICS.inc("missed", skipped, help_text="Sample periods skipped after falling behind")
+            deadline += skipped * period
+
+def measured_hz() -> float:
+    return 1.0 / acq_interval_s if acq_interval_s > 0 else 0.0
+
+def classify_loop():
+    """Classify every new frame exactly once (batched) and emit letter changes."""
+    global last_letter_emitted
+    seq = BUFFER.count
+    while True:
+        new_frames.wait(timeout=0.5)
+        new_frames.clear()
+        t, x, seq = BUFFER.since(seq)
+        if not len(t):
+            continue
+        with T_CLASSIFY.time():
+            letters, _ = best_letters_for_frames(x)
+        for ti, letter in zip(t.tolist(), letters):
+            VOTES.push(ti, letter)
+        now = float(t[-1])
 
-        # store in buffer
-        with buffer_lock:
-            BUFFER.append(frame)
+        # Translate mode: majority vote classification
+        winner, ratio = majority_in_window(now, TRANSLATE_VOTE_MS)
+        if winner and winner != last_letter_emitted and ratio >= TRANSLATE_MIN_CONF:
+            last_letter_emitted = winner
+            timed_emit("classification", {
+                "type": "letter",
+                "t": now,
+                "value": winner,
+                "confidence": round(ratio, 3)
+            })
 
-        # Raw data to client (throttled to ~10Hz)
-        if now - last_raw_emit >= 0.1:
-            socketio.emit("sensor", {
+def broadcast_loop():
+    """Throttled raw data and heartbeat; slow clients only ever delay this loop."""
+    last_status = 0.0
+    while True:
+        frame = BUFFER.latest_frame()
+        if frame:
+            timed_emit("sensor", {
                 "type": "raw",
                 "t": frame["t"],
                 "flex": frame["flex"],
                 "imu": frame["imu"]
             })
             # also emit legacy name for compatibility
-            socketio.emit("sensor_data", {
+            timed_emit("sensor_data", {
                 "flex_values": frame["flex"],
                 "detected_letter": None
             })
-            last_raw_emit = now
 
-        # Translate mode: majority vote classification
-        winner, ratio = majority_in_window(now, TRANSLATE_VOTE_MS)
-        if winner and winner != last_letter_emitted and ratio >= TRANSLATE_MIN_CONF:
-            last_letter_emitted = winner
-            socketio.emit("classification", {
-                "type": "letter",
-                "t": frame["t"],
-                "value": winner,
-                "confidence": round(ratio, 3)
+        now = time.time()
+        if now - last_status >= 1.0 / STATUS_EMIT_HZ:
+            METRICS.set("sample_rate_hz", round(measured_hz(), 2), "Smoothed measured acquisition rate")
+            timed_emit("status", {
+                "type": "status",
+                "ok": True,
+                "fps": round(measured_hz(), 1),
+                "target_fps": round(SAMPLE_HZ, 1),
+                "metrics": METRICS.summary()
             })
+            last_status = now
 
-        # heartbeat
-        socketio.emit("status", {
-            "type": "status",
-            "ok": True,
-            "fps": round(SAMPLE_HZ, 1)
-        })
+        socketio.sleep(1.0 / RAW_EMIT_HZ)
 
-        socketio.sleep(interval)
+def start_sensor_threads():
+    threading.Thread(target=acquisition_loop, name="acquisition", daemon=True).start()
+    socketio.start_background_task(classify_loop)
+    socketio.start_background_task(broadcast_loop)
 
 # --------------------------------------------------
 # Practice mode
@@ -404,10 +641,9 @@ def practice_collect(letter: str, duration_ms: int) -> Dict[str, Any]:
     samples: List[Tuple[float, List[int]]] = []
 
     while (time.time() - start) < (duration_ms / 1000.0):
-        with buffer_lock:
-            frame = BUFFER[-1] if BUFFER else None
-        if frame:
-            conf, per = frame_score_for_letter(frame, letter)
+        _, x = BUFFER.latest()
+        if x is not None:
+            conf, per = frame_score_for_letter(x, letter)
             samples.append((conf, per))
         socketio.sleep(1.0 / SAMPLE_HZ)
 
@@ -431,8 +667,7 @@ def practice_collect(letter: str, duration_ms: int) -> Dict[str, Any]:
     # tips based on last frame
     tips = []
     names = ["thumb","index","middle","ring","pinky"]
-    with buffer_lock:
-        last_frame = BUFFER[-1] if BUFFER else None
+    last_frame = BUFFER.latest_frame()
     if last_frame and letter in RANGES:
         feats = RANGES[letter]
         for i, ok in enumerate(per_flex_majority):
@@ -466,9 +701,15 @@ def health():
         "is_pi": IS_PI
     })
 
+@app.route("/metrics")
+def metrics_route():
+    METRICS.set("sample_rate_hz", round(measured_hz(), 2), "Smoothed measured acquisition rate")
+    METRICS.set("buffer_len", len(BUFFER), "Frames currently held in the ring buffer")
+    return METRICS.render(), 200, {"Content-Type": PROMETHEUS_CONTENT_TYPE}
+
 @app.route("/ranges", methods=["GET", "POST"])
 def ranges_endpoint():
-    global RANGES, RANGES_VERSION, LETTERS
+    global RANGES, RANGES_VERSION, LETTERS, COMPILED, VOTES
     if request.method == "GET":
         return jsonify({"version": RANGES_VERSION, "ranges": RANGES})
 
@@ -484,8 +725,11 @@ def ranges_endpoint():
                 return jsonify({"ok": False, "error": f"missing flex{i} for {letter}"}), 400
 
     RANGES = new_ranges
-    LETTERS = sorted(RANGES.keys())
+    COMPILED = compile_ranges(RANGES)
+    LETTERS = COMPILED.letters
     RANGES_VERSION = payload.get("version", time.strftime("%Y%m%d-%H%M%S"))
+    # votes were cast against the old ranges; swap rather than clear under the sensor loop
+    VOTES = VoteWindow()
     return jsonify({"ok": True, "version": RANGES_VERSION})
 
 @app.route("/letters")
@@ -495,8 +739,7 @@ def letters_route():
 @app.route("/sensor")
 def sensor_route():
     """Simple debugging endpoint: return last frame + best letter."""
-    with buffer_lock:
-        frame = BUFFER[-1] if BUFFER else None
+    frame = BUFFER.latest_frame()
     if not frame:
         return jsonify({"ok": False, "error": "no_data"}), 503
     letter, conf = best_letter_for_frame(frame)
@@ -544,20 +787,20 @@ def on_practice_begin(msg):
 # Main
 # --------------------------------------------------
 def main():
-    global RANGES, RANGES_VERSION, LETTERS
+    global RANGES, RANGES_VERSION, LETTERS, COMPILED
     # reload ranges if needed
     if not RANGES:
         try:
             RANGES = load_ranges(RANGES_PATH)
             RANGES_VERSION = time.strftime("%Y%m%d-%H%M%S", time.localtime(os.path.getmtime(RANGES_PATH)))
-            LETTERS = sorted(RANGES.keys())
         except Exception as e:
             print(f"[ERROR] Could not load ranges in main(): {e}")
             RANGES = {}
-            LETTERS = []
+        COMPILED = compile_ranges(RANGES)
+        LETTERS = COMPILED.letters
 
-    # start sensor loop in background
-    socketio.start_background_task(sensor_loop)
+    # start acquisition and its consumers in background
+    start_sensor_threads()
     print(f"[INFO] ASL server starting on {HOST}:{PORT}, CORS={CORS_ORIGINS}, is_pi={IS_PI}")
     try:
         socketio.run(app, host=HOST, port=PORT)
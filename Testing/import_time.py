@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import-time benchmark for the server modules.
+
+Runs `python -X importtime -c "import <module>"` from the repo root in a
+fresh interpreter per module, then prints the total import time and the
+slowest top-level imports. Exits non-zero if a module exceeds its budget,
+so a heavy import sneaking back into app.py shows up immediately.
+
+    python Testing/import_time.py                 # app, inference, model
+    python Testing/import_time.py app --top 25
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# seconds; app must come up well under a second on the Pi
+BUDGET_S = {
+    "app": 0.8,
+    "inference": 0.4,
+    "runtime": 0.4,
+}
+
+
+def import_profile(module):
+    """[(self_us, cumulative_us, depth, name)] in the order -X importtime reports them."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cum_us), depth, name.strip()))
+    return rows
+
+
+def report(module, top):
+    rows = import_profile(module)
+    end = max(i for i, r in enumerate(rows) if r[2] == 0 and r[3] == module)
+    start = max((i for i in range(end) if rows[i][2] == 0), default=-1) + 1
+    total = rows[end][1] / 1e6
+    print(f"\nimport {module}: {1e3 * total:.1f} ms")
+    # direct children of `module` only (children are listed before their parent),
+    # so the numbers do not double count and interpreter startup is left out
+    children = sorted((r for r in rows[start:end] if r[2] == 1), key=lambda r: -r[1])
+    for _, cum, _, name in children[:top]:
+        print(f"  {cum / 1e3:8.1f} ms  {name}")
+    budget = BUDGET_S.get(module)
+    if budget is not None and total > budget:
+        print(f"  OVER BUDGET ({1e3 * budget:.0f} ms)")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=["app", "inference", "model"])
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    ok = True
+    for module in args.modules:
+        try:
+            ok &= report(module, args.top)
+        except RuntimeError as e:
+            print(f"\n{e}")
+            ok = False
+    sys.exit(0 if ok else 1)
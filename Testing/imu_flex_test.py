@@ -4,8 +4,12 @@ import smbus2
 import spidev
 import time
 import math
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mpu6050 import MPU6050
+
 # ---------------------------
 # Config
 # ---------------------------
@@ -23,6 +27,7 @@ ACCEL_SF = 16384.0
 GYRO_SF  = 131.0
 
 PRINT_HZ = 10
+IMU_FIFO_HZ = 200  # 0 = poll the output registers once per print
 CALIBRATION_TIME = 1.0
 
 # ---------------------------
@@ -85,6 +90,41 @@ def calibrate(bus):
     print("Calibration done.\n")
     return (bx, by, bz), (r0, p0)
 
+def run_fifo(spi, bus, bias, roll, pitch, alpha):
+    """Same printout, but the IMU is sampled by its FIFO at IMU_FIFO_HZ and
+    every sample goes through the filter with the hardware period."""
+    bx, by, bz = bias
+    imu = MPU6050(bus, MPU6050_ADDR, ACCEL_SF, GYRO_SF)
+    imu.start_fifo(IMU_FIFO_HZ)
+    dt = 1.0 / imu.fifo_rate
+    dt_target = 1.0 / PRINT_HZ
+
+    print(f"\nFIFO streaming at {imu.fifo_rate:.0f} Hz")
+    print("\n ROLL   PITCH  |  THM   PTR   MID   RNG   PKY   (n)")
+    print("-----------------------------------------------------")
+    try:
+        while True:
+            t_now = time.perf_counter()
+            _, samples = imu.read_fifo()
+            for ax, ay, az, gx, gy, _ in samples.tolist():
+                roll_g  = roll  + (gx - bx) * dt
+                pitch_g = pitch + (gy - by) * dt
+                roll_acc, pitch_acc = accel_to_angles(ax, ay, az)
+                roll  = alpha * roll_g  + (1.0 - alpha) * roll_acc
+                pitch = alpha * pitch_g + (1.0 - alpha) * pitch_acc
+
+            flex_vals = [read_mcp3008_single(spi, ch) for ch in FLEX_CHANNELS]
+            flex_strs = [f"{val:4d}" for val in flex_vals]
+            print(" {:+6.2f}  {:+6.2f}  | ".format(roll, pitch) + "  ".join(flex_strs) + f"  ({len(samples)})")
+
+            sleep_for = dt_target - (time.perf_counter() - t_now)
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        imu.stop_fifo()
+
 # ---------------------------
 # Main
 # ---------------------------
@@ -109,6 +149,14 @@ def main():
     print("\n ROLL   PITCH  |  THM   PTR   MID   RNG   PKY")
     print("-----------------------------------------------")
 
+    if IMU_FIFO_HZ:
+        try:
+            run_fifo(spi, bus, (bx, by, bz), roll, pitch, alpha)
+        finally:
+            spi.close()
+            bus.close()
+        return
+
     try:
         while True:
             # IMU
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Replay a recorded session through the translate loop's commit logic.
+
+The recording must be one gather_data2.py session (its CSV, rows in
+the order they were sampled at gather_data2.SAMPLE_HZ), not a shuffled
+train/test split: recordings whose median label run is shorter than
+MIN_RUN_S are rejected. It is classified once with the served model. Both commit rules then run over
+the same class probabilities, each resampled to its own loop rate:
+
+  * stable  - the old translate_FSM rule: STABLE_CNT identical argmax
+              predictions with conf > 0.4 at 7 Hz, then a 0.75 s pause
+              (2 s after REST)
+  * engine  - commit_engine.CommitEngine at the new translate rate
+
+Every maximal run of one label counts as one signed letter. A commit
+inside a run is a hit if it is the run's label and the first for that
+run. Its time-to-letter is measured from the start of the run. Any other
+commit (a wrong letter, or the same letter again within the run) counts
+as false.
+
+    python Testing/replay_commit.py sign_language_data_copper.csv
+    python Testing/replay_commit.py session.csv --rec-hz 30 --threshold 8 --leak 0.85
+    python Testing/replay_commit.py session.csv --sweep   # threshold x leak grid
+
+The commit_engine defaults should be (re)chosen from the --sweep table of
+a real session and committed together with it.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import dataset                                  # noqa: E402
+from commit_engine import CommitEngine          # noqa: E402
+import commit_engine                            # noqa: E402
+
+STABLE_HZ = 7
+STABLE_CNT = 15
+STABLE_CONF = 0.4
+MIN_RUN_S = 0.5  # shorter runs are not something a signer held
+SWEEP_THRESHOLDS = (4.0, 6.0, 8.0, 10.0, 14.0)
+SWEEP_LEAKS = (0.8, 0.85, 0.9, 0.95)
+
+
+def frames_at(n_frames, rec_hz, hz):
+    """Recording row seen by a loop sampling at `hz`, for every tick of that loop."""
+    t = np.arange(0.0, n_frames / rec_hz, 1.0 / hz)
+    return np.minimum((t * rec_hz).astype(np.int64), n_frames - 1)
+
+
+def replay_stable(labels, conf, rec_hz, rest="REST"):
+    """[(row, label)] commits of the old count-based rule, pauses included."""
+    commits = []
+    curr, count = None, 0
+    t, t_end = 0.0, len(labels) / rec_hz
+    while t < t_end:
+        i = int(t * rec_hz)
+        if labels[i] == curr and conf[i] > STABLE_CONF:
+            count += 1
+            if count == STABLE_CNT:
+                commits.append((i, curr))
+                count = 1
+                t += 2.0 if curr == rest else 0.75
+        else:
+            curr, count = labels[i], 1
+        t += 1.0 / STABLE_HZ
+    return commits
+
+
+def replay_engine(probs, classes, rec_hz, hz, **kwargs):
+    """[(row, label)] commits of a CommitEngine sampling at `hz`."""
+    engine = CommitEngine(classes, **kwargs)
+    commits = []
+    for i in frames_at(len(probs), rec_hz, hz):
+        label = engine.update(probs[i])
+        if label is not None:
+            commits.append((int(i), label))
+    return commits
+
+
+def score(commits, truth, runs, rec_hz, min_run=0):
+    """Hits {run: time-to-letter (s)} and the false commit count; runs under min_run rows are not scored."""
+    run_of = np.empty(len(truth), dtype=np.int64)
+    for r, (start, end) in enumerate(runs):
+        run_of[start:end] = r
+    hit = {}
+    false = 0
+    for i, label in commits:
+        r = run_of[i]
+        if runs[r][1] - runs[r][0] < min_run:
+            continue
+        if label == truth[i] and r not in hit:
+            hit[r] = (i - runs[r][0]) / rec_hz
+        else:
+            false += 1
+    return hit, false
+
+
+def report(name, commits, truth, runs, rec_hz, min_run, n_runs):
+    hit, false = score(commits, truth, runs, rec_hz, min_run)
+    ttl = np.array(list(hit.values())) if hit else np.array([np.nan])
+    print(f"{name:>20} {len(hit):6d} {100 * len(hit) / max(n_runs, 1):6.1f}% "
+          f"{1e3 * np.median(ttl):6.0f}ms {1e3 * np.percentile(ttl, 90):6.0f}ms {false:6d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", help="csv (or dataset.py directory) of one session, rows in recording order")
+    parser.add_argument("--rec-hz", type=float, default=30, help="rate the recording was sampled at")
+    parser.add_argument("--hz", type=float, default=30, help="translate loop rate for the engine")
+    parser.add_argument("--threshold", type=float, default=commit_engine.COMMIT_LLR)
+    parser.add_argument("--release", type=float, default=commit_engine.RELEASE_LLR)
+    parser.add_argument("--leak", type=float, default=commit_engine.LEAK)
+    parser.add_argument("--cap", type=float, default=commit_engine.CAP)
+    parser.add_argument("--min-frames", type=int, default=commit_engine.MIN_FRAMES)
+    parser.add_argument("--sweep", action="store_true",
+                        help="also replay the engine over a threshold x leak grid")
+    args = parser.parse_args()
+
+    from inference import get_service
+
+    data = dataset.load(args.recording, mmap=False)
+    truth = data.classes[data.y]
+    min_run = int(MIN_RUN_S * args.rec_hz)
+    runs = dataset.label_runs(data.y)
+    median_run = np.median([e - s for s, e in runs])
+    if median_run < min_run:
+        parser.error(f"{args.recording}: median label run is {median_run:g} rows, under {MIN_RUN_S}s at "
+                     f"{args.rec_hz:g} Hz. This looks like a shuffled split, not a session recording")
+    service = get_service()
+    labels, probs = service.predict_batch(data.X)
+    classes = service.engine.classes
+    conf = probs.max(axis=1)
+
+    n_runs = sum(e - s >= min_run for s, e in runs)
+    print(f"{len(truth)} rows, {n_runs} signed runs >= {MIN_RUN_S}s "
+          f"(of {len(runs)}), per-frame accuracy {100 * np.mean(labels == truth):.1f}%")
+    if args.hz > args.rec_hz:
+        print(f"[WARN] replaying {args.rec_hz:g} Hz data at {args.hz:g} Hz repeats rows")
+
+    results = {
+        f"stable {STABLE_CNT}@{STABLE_HZ}Hz": replay_stable(labels, conf, args.rec_hz),
+        f"engine @{args.hz:g}Hz": replay_engine(probs, classes, args.rec_hz, args.hz,
+                                               threshold=args.threshold, release=args.release,
+                                               leak=args.leak, cap=args.cap, min_frames=args.min_frames),
+    }
+    print(f"\n{'rule':>20} {'hits':>6} {'recall':>7} {'median':>8} {'p90':>8} {'false':>6}")
+    for name, commits in results.items():
+        report(name, commits, truth, runs, args.rec_hz, min_run, n_runs)
+
+    if args.sweep:
+        print(f"\n{'threshold/leak':>20} {'hits':>6} {'recall':>7} {'median':>8} {'p90':>8} {'false':>6}")
+        for threshold in SWEEP_THRESHOLDS:
+            for leak in SWEEP_LEAKS:
+                commits = replay_engine(probs, classes, args.rec_hz, args.hz,
+                                        threshold=threshold, release=args.release,
+                                        leak=leak, cap=args.cap, min_frames=args.min_frames)
+                report(f"{threshold:g}/{leak:g}", commits, truth, runs, args.rec_hz, min_run, n_runs)
@@ -0,0 +1,270 @@
+"""
+2025 SignWave
+
+BMI323 driver over I2C or SPI, built on registers.py.
+
+Exposes the same sample interface as mpu6050.MPU6050 (setup, read_raw,
+read, collect, scale, start_fifo/read_fifo/reset_fifo/stop_fifo, stream,
+fifo_rate) so DataCollector and Main/app.py can use either IMU.
+
+Registers are 16 bits wide and little-endian. Reads carry dummy bytes in
+front of the data: two on I2C, one on SPI.
+"""
+import time
+
+import numpy as np
+from smbus2 import SMBus, i2c_msg
+
+import registers as reg
+from spi_funcs import SPI_DEVICE
+
+BMI323_I2C_ADDR = 0x68
+BMI323_CHIP_ID = 0x43
+SOFT_RESET = 0xDEAF
+
+# ACC_CONF / GYR_CONF fields
+ODR_CODES = {12.5: 0x5, 25.0: 0x6, 50.0: 0x7, 100.0: 0x8, 200.0: 0x9,
+             400.0: 0xA, 800.0: 0xB, 1600.0: 0xC, 3200.0: 0xD, 6400.0: 0xE}
+MODE_NORMAL = 0x4
+ACC_RANGE_2G = 0x0
+GYR_RANGE_250DPS = 0x1
+ACC_SF = 16384.0     # LSB/g at +-2 g
+GYR_SF = 131.072     # LSB/(deg/s) at +-250 deg/s
+
+# FIFO
+FIFO_ACC_EN = 1 << 9
+FIFO_GYR_EN = 1 << 10
+FIFO_FLUSH = 0x0001
+FIFO_SIZE_WORDS = 1024
+FIFO_FRAME_WORDS = 6          # acc x/y/z, gyr x/y/z
+FIFO_EMPTY = -0x8000          # 0x8000: no data
+FIFO_ACC_DUMMY = 0x7F01
+FIFO_GYR_DUMMY = 0x7F02
+FIFO_RESYNC_S = 0.05
+
+
+def _odr_code(rate_hz):
+    """Smallest supported ODR at or above rate_hz."""
+    for odr in sorted(ODR_CODES):
+        if odr >= rate_hz:
+            return odr, ODR_CODES[odr]
+    odr = max(ODR_CODES)
+    return odr, ODR_CODES[odr]
+
+
+class BMI323_I2C:
+    """Register access over I2C: two dummy bytes precede read data."""
+    DUMMY_BYTES = 2
+
+    def __init__(self, bus, addr=BMI323_I2C_ADDR) -> None:
+        self.bus = bus
+        self.addr = addr
+
+    def read_words(self, register_addr, n):
+        write = i2c_msg.write(self.addr, [register_addr])
+        read = i2c_msg.read(self.addr, self.DUMMY_BYTES + 2 * n)
+        self.bus.i2c_rdwr(write, read)
+        return bytes(read)[self.DUMMY_BYTES:]
+
+    def write_word(self, register_addr, value):
+        self.bus.write_i2c_block_data(self.addr, register_addr, [value & 0xFF, (value >> 8) & 0xFF])
+
+    def close(self):
+        self.bus.close()
+
+
+class BMI323_SPI:
+    """Register access through spi_funcs.SPI_DEVICE: one dummy byte precedes read data."""
+    DUMMY_BYTES = 1
+
+    def __init__(self, spi_device) -> None:
+        self.spi = spi_device
+
+    def read_words(self, register_addr, n):
+        data = self.spi.read_registers(register_addr, self.DUMMY_BYTES + 2 * n)
+        return bytes(data[self.DUMMY_BYTES:])
+
+    def write_word(self, register_addr, value):
+        self.spi.write_registers(register_addr, [value & 0xFF, (value >> 8) & 0xFF])
+
+    def close(self):
+        self.spi.close()
+
+
+class BMI323:
+
+    def __init__(self, transport, accel_sf=ACC_SF, gyro_sf=GYR_SF) -> None:
+        """Wrap a BMI323 behind an I2C or SPI transport
+
+        Parameters
+        ----------
+        transport : BMI323_I2C or BMI323_SPI
+            Register access layer
+        accel_sf : float
+            Accelerometer LSB per g for the configured range
+        gyro_sf : float
+            Gyroscope LSB per deg/s for the configured range
+        """
+        self.io = transport
+        self.accel_sf = accel_sf
+        self.gyro_sf = gyro_sf
+        self.fifo_rate = None
+        self.is_spi = isinstance(transport, BMI323_SPI)
+
+    def read_word(self, register_addr):
+        return int(np.frombuffer(self.io.read_words(register_addr, 1), dtype="<u2")[0])
+
+    def setup(self, rate_hz=100.0):
+        """Soft reset, check the chip id and enable accel+gyro in normal mode at rate_hz."""
+        self.io.write_word(reg.CMD, SOFT_RESET)
+        time.sleep(0.002)
+        if self.is_spi:
+            self.read_word(reg.CHIP_ID)  # first read after reset switches the interface to SPI
+        chip_id = self.read_word(reg.CHIP_ID) & 0xFF
+        if chip_id != BMI323_CHIP_ID:
+            raise RuntimeError(f"BMI323 not found (CHIP_ID=0x{chip_id:02X})")
+        self.configure(rate_hz)
+
+    def configure(self, rate_hz):
+        odr, code = _odr_code(rate_hz)
+        self.io.write_word(reg.ACC_CONF, (MODE_NORMAL << 12) | (ACC_RANGE_2G << 4) | code)
+        self.io.write_word(reg.GYR_CONF, (MODE_NORMAL << 12) | (GYR_RANGE_250DPS << 4) | code)
+        self.odr = odr
+        time.sleep(0.05)
+
+    def read_raw(self):
+        """(ax, ay, az, temp, gx, gy, gz) raw int16 counts from one 7-word burst."""
+        ax, ay, az, gx, gy, gz, temp = np.frombuffer(
+            self.io.read_words(reg.ACC_DATA_X, 7), dtype="<i2").tolist()
+        return ax, ay, az, temp, gx, gy, gz
+
+    def read(self):
+        """(ax, ay, az) in g and (gx, gy, gz) in deg/s from one burst."""
+        ax, ay, az, _, gx, gy, gz = self.read_raw()
+        a, g = self.accel_sf, self.gyro_sf
+        return ax / a, ay / a, az / a, gx / g, gy / g, gz / g
+
+    def collect(self, duration, period=0.002):
+        """Burst-read samples for `duration` seconds into an (n, 7) raw array."""
+        rows = []
+        t_end = time.time() + duration
+        while time.time() < t_end:
+            rows.append(self.read_raw())
+            time.sleep(period)
+        if not rows:
+            rows.append(self.read_raw())
+        return np.asarray(rows, dtype=np.float64)
+
+    def temp_c(self, raw):
+        """Die temperature in degrees C from raw TEMP_DATA counts (scalar or array)."""
+        return raw / 512.0 + 23.0
+
+    def scale(self, raw):
+        """Convert an (n, 7) raw array into (n, 6) [ax, ay, az, gx, gy, gz] in g and deg/s."""
+        raw = np.asarray(raw, dtype=np.float64)
+        out = np.empty(raw.shape[:-1] + (6,), dtype=np.float64)
+        out[..., :3] = raw[..., 0:3] / self.accel_sf
+        out[..., 3:] = raw[..., 4:7] / self.gyro_sf
+        return out
+
+    # ---------------------------
+    # FIFO streaming
+    # ---------------------------
+    def start_fifo(self, rate_hz=400.0, watermark_frames=16):
+        """Run accel+gyro at the ODR nearest above rate_hz and queue them in the FIFO
+
+        Parameters
+        ----------
+        rate_hz : float
+            Requested sample rate; the achieved ODR is stored in `fifo_rate`
+        watermark_frames : Integer
+            FIFO_WATERMARK level, in acc+gyr frames
+        """
+        self.configure(rate_hz)
+        self.fifo_rate = self.odr
+        self.io.write_word(reg.FIFO_WATERMARK, min(watermark_frames * FIFO_FRAME_WORDS, FIFO_SIZE_WORDS - 1))
+        self.io.write_word(reg.FIFO_CONF, FIFO_ACC_EN | FIFO_GYR_EN)
+        self.reset_fifo()
+
+    def reset_fifo(self):
+        self.io.write_word(reg.FIFO_CTRL, FIFO_FLUSH)
+        self.__fifo_t0 = time.time()
+        self.__fifo_n = 0
+
+    def stop_fifo(self):
+        self.io.write_word(reg.FIFO_CONF, 0x0000)
+
+    def fifo_fill_words(self):
+        """Words currently queued (0..FIFO_SIZE_WORDS)."""
+        return self.read_word(reg.FIFO_FILL_LEVEL) & 0x07FF
+
+    def fifo_count(self):
+        """Complete frames currently queued."""
+        return self.fifo_fill_words() // FIFO_FRAME_WORDS
+
+    def read_fifo(self):
+        """
+        Drain the queued frames in one burst of FIFO_DATA.
+        Returns (t, samples): t is (n,) evenly spaced host timestamps and
+        samples is (n, 6) [ax, ay, az, gx, gy, gz] in g and deg/s.
+        """
+        words = self.fifo_fill_words()
+        n = words // FIFO_FRAME_WORDS
+        if n == 0:
+            return np.empty(0), np.empty((0, 6))
+        # no room for another whole frame: new samples were dropped and frame alignment may be lost
+        if words >= FIFO_SIZE_WORDS - FIFO_FRAME_WORDS + 1:
+            print("[WARN] BMI323 FIFO full, samples were dropped; resetting")
+            self.reset_fifo()
+            return np.empty(0), np.empty((0, 6))
+
+        raw = np.frombuffer(self.io.read_words(reg.FIFO_DATA, n * FIFO_FRAME_WORDS),
+                            dtype="<i2").reshape(n, FIFO_FRAME_WORDS)
+        valid = ~((raw == FIFO_EMPTY).any(axis=1)
+                  | (raw[:, 0] == FIFO_ACC_DUMMY) | (raw[:, 3] == FIFO_GYR_DUMMY))
+        raw = raw[valid]
+        n = len(raw)
+        if n == 0:
+            return np.empty(0), np.empty((0, 6))
+
+        samples = np.empty((n, 6), dtype=np.float64)
+        samples[:, :3] = raw[:, :3] / self.accel_sf
+        samples[:, 3:] = raw[:, 3:] / self.gyro_sf
+
+        period = 1.0 / self.fifo_rate
+        t = self.__fifo_t0 + (self.__fifo_n + 1 + np.arange(n)) * period
+        self.__fifo_n += n
+        drift = time.time() - t[-1]
+        if abs(drift) > FIFO_RESYNC_S:
+            self.__fifo_t0 += drift
+            t += drift
+        return t, samples
+
+    def stream(self, rate_hz=400.0, poll_s=None):
+        """Generator of (t, (ax, ay, az, gx, gy, gz)) at the hardware ODR."""
+        self.start_fifo(rate_hz)
+        if poll_s is None:
+            poll_s = (FIFO_SIZE_WORDS // FIFO_FRAME_WORDS) / self.fifo_rate / 4
+        try:
+            while True:
+                t, samples = self.read_fifo()
+                for ti, row in zip(t.tolist(), samples.tolist()):
+                    yield ti, tuple(row)
+                time.sleep(poll_s)
+        finally:
+            self.stop_fifo()
+
+    def close(self):
+        self.io.close()
+
+
+def open_bmi323_i2c(bus_num=1, addr=BMI323_I2C_ADDR):
+    imu = BMI323(BMI323_I2C(SMBus(bus_num), addr))
+    imu.setup()
+    return imu
+
+
+def open_bmi323_spi(cs_pin=None, spi_bus=0, spi_device=0):
+    imu = BMI323(BMI323_SPI(SPI_DEVICE(DEVICE_CS_PIN=cs_pin, SPI_BUS=spi_bus, SPI_DEVICE=spi_device)))
+    imu.setup()
+    return imu
@@ -0,0 +1,227 @@
+"""
+2025 SignWave
+
+Persisted IMU calibration.
+
+After every measurement, the gyro bias, the resting attitude, the die
+temperature and a timestamp are written to a small JSON file. On
+start-up, `load` returns the stored calibration if all of these hold:
+
+  * it was measured on the same sensor
+  * it is younger than MAX_AGE_S
+  * the die is within MAX_TEMP_DRIFT_C of the temperature it was
+    measured at (MEMS gyro bias moves with temperature)
+
+Otherwise the caller measures again with `measure`, which block-reads
+raw samples into one array and averages it.
+
+While a collection loop runs, BiasRefiner watches its samples. Whenever
+the glove has been still for a window, it folds that window's mean gyro
+reading into the bias and saves the result from a background thread, so
+the stored value follows warm-up drift and a restart can skip the
+"hold still" step entirely.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+CALIBRATION_PATH = "imu_calibration.json"
+STORE_VERSION = 1
+MAX_AGE_S = 7 * 24 * 3600
+MAX_TEMP_DRIFT_C = 8.0
+
+# BiasRefiner
+STILL_WINDOW = 64       # samples per refinement window
+STILL_GYRO_STD = 0.3    # deg/s per axis; a resting MPU-6050 at +-250 deg/s is ~0.05
+STILL_ACCEL_G = 0.05    # |a| must stay within this of 1 g
+MAX_BIAS_STEP = 2.0     # deg/s; a window this far from the bias is slow motion, not drift
+REFINE_WEIGHT = 0.2     # share of each still window in the refined bias
+SAVE_EVERY_S = 60.0
+
+Calibration = namedtuple("Calibration", ["sensor", "bias", "roll", "pitch", "temp_c", "timestamp", "samples"])
+
+
+def accel_to_angles(ax_g, ay_g, az_g):
+    """Roll and pitch (deg) from the gravity vector."""
+    roll = math.degrees(math.atan2(ay_g, az_g if abs(az_g) > 1e-8 else 1e-8))
+    pitch = math.degrees(math.atan2(-ax_g, math.sqrt(ay_g * ay_g + az_g * az_g)))
+    return roll, pitch
+
+
+def sensor_id(imu):
+    """Identifies the device a calibration belongs to, e.g. "MPU6050@0x68"."""
+    addr = getattr(imu, "addr", None)
+    if addr is None:
+        addr = getattr(getattr(imu, "io", None), "addr", None)
+    name = type(imu).__name__
+    return name if addr is None else f"{name}@0x{addr:02x}"
+
+
+def from_samples(sensor, samples, temps=None):
+    """
+    Calibration from an (n, 6) array of [ax, ay, az, gx, gy, gz] (g, deg/s)
+    read at rest, and optionally the (n,) die temperatures in degrees C.
+    """
+    samples = np.asarray(samples, dtype=np.float64).reshape(-1, 6)
+    mean = samples.mean(axis=0)
+    roll, pitch = accel_to_angles(*mean[:3].tolist())
+    temp = float(np.mean(temps)) if temps is not None and len(temps) else None
+    return Calibration(sensor, tuple(mean[3:].tolist()), roll, pitch, temp, time.time(), len(samples))
+
+
+def measure(imu, duration):
+    """Hold-still calibration of an mpu6050.MPU6050 / bmi323.BMI323 from one array of block reads."""
+    raw = imu.collect(duration)
+    return from_samples(sensor_id(imu), imu.scale(raw), imu.temp_c(raw[:, 3]))
+
+
+def current_temp(imu):
+    try:
+        return float(imu.temp_c(imu.read_raw()[3]))
+    except (AttributeError, OSError):
+        return None
+
+
+def save(cal, path=CALIBRATION_PATH):
+    """Write atomically: a crash mid-save leaves the previous calibration in place."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": STORE_VERSION, **cal._asdict()}, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def load(path=CALIBRATION_PATH, sensor=None, temp_c=None, max_age_s=MAX_AGE_S,
+         max_temp_drift_c=MAX_TEMP_DRIFT_C):
+    """The stored Calibration if it is still valid for `sensor` at `temp_c`, else None."""
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.pop("version", None) != STORE_VERSION:
+        return None
+    try:
+        cal = Calibration(**stored)._replace(bias=tuple(stored["bias"]))
+    except TypeError:
+        return None
+    age = time.time() - cal.timestamp
+    reason = None
+    if sensor is not None and cal.sensor != sensor:
+        reason = f"it is for {cal.sensor}, not {sensor}"
+    elif not 0 <= age <= max_age_s:
+        reason = f"it is {age / 3600:.1f} h old"
+    elif temp_c is not None and cal.temp_c is not None and abs(temp_c - cal.temp_c) > max_temp_drift_c:
+        reason = f"the die is at {temp_c:.1f} C, calibrated at {cal.temp_c:.1f} C"
+    if reason is not None:
+        print(f"[INFO] Not using stored IMU calibration {path}: {reason}")
+        return None
+    return cal
+
+
+def load_or_measure(imu, duration, path=CALIBRATION_PATH):
+    """
+    (Calibration, warm). A valid stored calibration is used immediately (warm=True)
+    with roll/pitch re-read from the current gravity vector, since the glove is
+    unlikely to rest where it was calibrated. Otherwise it is measured and saved.
+    """
+    sensor = sensor_id(imu)
+    cal = load(path, sensor, current_temp(imu))
+    if cal is not None:
+        ax, ay, az = imu.scale(imu.collect(0.02))[:, :3].mean(axis=0).tolist()
+        roll, pitch = accel_to_angles(ax, ay, az)
+        print(f"[INFO] Using stored IMU calibration from {time.ctime(cal.timestamp)}")
+        return cal._replace(roll=roll, pitch=pitch), True
+    print("Calibrating IMU... keep the glove steady")
+    cal = measure(imu, duration)
+    save(cal, path)
+    print("Calibration done.")
+    return cal, False
+
+
+class BiasRefiner:
+
+    def __init__(self, cal, path=CALIBRATION_PATH, read_temp=None, window=STILL_WINDOW,
+                 weight=REFINE_WEIGHT, save_every_s=SAVE_EVERY_S) -> None:
+        """Track gyro bias drift from still stretches of the live stream
+
+        Parameters
+        ----------
+        cal : Calibration
+            Starting point (loaded or just measured)
+        path : str or None
+            Where refined calibrations are saved; None keeps them in memory
+        read_temp : callable, optional
+            Returns the die temperature; called once per accepted window
+        window : Integer
+            Samples per still-detection window
+        weight : float
+            How far each still window moves the bias toward its own mean
+        save_every_s : float
+            Minimum time between saves
+        """
+        self.cal = cal
+        self.bias = np.asarray(cal.bias, dtype=np.float64)
+        self.path = path
+        self.read_temp = read_temp
+        self.weight = weight
+        self.save_every_s = save_every_s
+        self.__buf = np.empty((window, 6), dtype=np.float64)
+        self.__n = 0
+        self.__last_save = time.monotonic()
+        self.__save_lock = threading.Lock()
+
+    def observe(self, sample):
+        """Add one [ax, ay, az, gx, gy, gz] sample (gyro NOT bias-corrected). Returns the new bias or None."""
+        self.__buf[self.__n] = sample
+        self.__n += 1
+        if self.__n < len(self.__buf):
+            return None
+        self.__n = 0
+        return self.__refine()
+
+    def observe_block(self, samples):
+        """observe() for an (n, 6) block, e.g. a drained FIFO. Returns the last new bias or None."""
+        new_bias = None
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, 6)
+        i = 0
+        while i < len(samples):
+            take = min(len(self.__buf) - self.__n, len(samples) - i)
+            self.__buf[self.__n:self.__n + take] = samples[i:i + take]
+            self.__n += take
+            i += take
+            if self.__n == len(self.__buf):
+                self.__n = 0
+                new_bias = self.__refine() or new_bias
+        return new_bias
+
+    def __refine(self):
+        gyro = self.__buf[:, 3:]
+        if gyro.std(axis=0).max() > STILL_GYRO_STD:
+            return None
+        if np.abs(np.linalg.norm(self.__buf[:, :3], axis=1) - 1.0).max() > STILL_ACCEL_G:
+            return None
+        mean = gyro.mean(axis=0)
+        if np.abs(mean - self.bias).max() > MAX_BIAS_STEP:
+            return None
+        self.bias += self.weight * (mean - self.bias)
+        temp = self.read_temp() if self.read_temp is not None else self.cal.temp_c
+        self.cal = self.cal._replace(bias=tuple(self.bias.tolist()), temp_c=temp, timestamp=time.time(),
+                                     samples=self.cal.samples + len(self.__buf))
+        now = time.monotonic()
+        if self.path is not None and now - self.__last_save >= self.save_every_s:
+            self.__last_save = now
+            threading.Thread(target=self.__save, args=[self.cal], daemon=True).start()
+        return self.cal.bias
+
+    def __save(self, cal):
+        with self.__save_lock:
+            try:
+                save(cal, self.path)
+            except OSError as e:
+                print(f"[WARN] Could not save IMU calibration: {e}")
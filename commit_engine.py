@@ -0,0 +1,125 @@
+"""
+2025 SignWave
+
+Evidence-accumulating letter commit for the translate loop.
+
+Instead of waiting for N identical argmax predictions, every sample's
+softmax adds its log-probabilities to a leaky per-class evidence vector
+(a sequential probability ratio test between the leading class and the
+runner-up). A letter commits as soon as its log-evidence margin over the
+runner-up reaches `threshold`:
+
+    L_c <- leak * L_c + log(max(p_c, floor))          for every class c
+    L   <- max(L - max(L), -cap)                      (leader sits at 0)
+    margin = -(second largest L)
+
+A confident stream of samples crosses the threshold in a handful of
+frames, while hesitant or flickering ones take longer or never commit.
+The cap bounds how much evidence a held letter can bank, so the next
+letter needs only a few frames to overturn it.
+
+Hysteresis: a committed letter is latched and cannot commit again until
+some other class has led by at least `release`. Holding a sign therefore
+emits it once, and deliberate double letters need a brief release (e.g.
+REST) in between.
+
+    python Testing/replay_commit.py session.csv --sweep   # time-to-letter / false commits
+
+session.csv is one gather_data2.py recording in sampling order. The
+constants below are starting values derived from the update rule (three
+to five confident frames to commit at 30 Hz), not tuned ones. Retune them
+from the --sweep table of a real session and commit that table with them.
+"""
+import numpy as np
+
+COMMIT_LLR = 10.0   # nats of margin over the runner-up needed to commit
+RELEASE_LLR = 4.0   # margin another class needs before the latched letter may repeat
+LEAK = 0.9          # per-sample evidence retention; forgets ~1/(1-LEAK) samples
+CAP = 20.0          # most evidence a losing class can be behind by
+PROB_FLOOR = 1e-3   # one overconfident sample is worth at most log(1/floor)
+MIN_FRAMES = 3      # consecutive samples the leader must be the argmax
+
+
+class CommitEngine:
+
+    def __init__(self, classes, threshold=COMMIT_LLR, release=RELEASE_LLR, leak=LEAK, cap=CAP,
+                 floor=PROB_FLOOR, min_frames=MIN_FRAMES, ignore=()) -> None:
+        """Commit letters from a stream of class probabilities
+
+        Parameters
+        ----------
+        classes : array-like
+            Class labels in the order of the probability vectors
+        threshold : float
+            Log-evidence margin (nats) at which the leader commits
+        release : float
+            Margin another class must reach to unlatch the last commit
+        leak : float
+            Evidence retention per sample, in (0, 1]
+        cap : float
+            Bound on how far behind the leader any class can fall
+        floor : float
+            Probabilities are clipped to at least this before the log
+        min_frames : int
+            The leader must also have been the per-sample argmax this many times in a row
+        ignore : iterable
+            Labels that latch like any other but are never returned (e.g. REST in practice)
+        """
+        self.classes = np.asarray(classes)
+        self.threshold = threshold
+        self.release = release
+        self.leak = leak
+        self.cap = cap
+        self.floor = floor
+        self.min_frames = min_frames
+        self.ignore = set(ignore)
+        self.evidence = np.zeros(len(self.classes), dtype=np.float64)
+        self.__logp = np.empty_like(self.evidence)
+        self.reset()
+
+    def reset(self):
+        """Forget all evidence and the latch (start of a session)."""
+        self.evidence.fill(0.0)
+        self.leader = None    # class index currently ahead
+        self.margin = 0.0     # its log-evidence lead over the runner-up
+        self.latched = None   # class index of the last commit
+        self.run = 0          # consecutive samples whose argmax was the leader
+
+    @property
+    def progress(self):
+        """How close the leader is to committing, 0..1 (0 while it is the latched letter)."""
+        if self.leader is None or self.leader == self.latched:
+            return 0.0
+        return min(self.margin / self.threshold, 1.0)
+
+    def update(self, probs):
+        """
+        Add one sample's class probabilities.
+        Returns the committed label, or None if nothing committed on this sample.
+        """
+        logp = self.__logp
+        np.maximum(probs, self.floor, out=logp)
+        np.log(logp, out=logp)
+        L = self.evidence
+        L *= self.leak
+        L += logp
+        top = int(L.argmax())
+        L -= L[top]
+        np.maximum(L, -self.cap, out=L)
+        L[top] = -np.inf
+        self.margin = -float(L.max()) if len(L) > 1 else self.cap
+        L[top] = 0.0
+
+        if top == self.leader and int(logp.argmax()) == top:
+            self.run += 1
+        else:
+            self.run = 1 if int(logp.argmax()) == top else 0
+        self.leader = top
+
+        if self.latched is not None and top != self.latched and self.margin >= self.release:
+            self.latched = None
+        if top == self.latched or self.margin < self.threshold or self.run < self.min_frames:
+            return None
+        self.latched = top
+        label = str(self.classes[top])
+        return None if label in self.ignore else label
@@ -0,0 +1,153 @@
+"""
+2025 SignWave
+
+Binary dataset build step.
+
+A recording CSV (feature columns + "label") is parsed once and written
+as a directory of .npy files next to it:
+
+    <name>.dataset/
+        X.npy          float32 (n, n_features)
+        y.npy          int16 codes into meta["classes"]
+        train.npy      int32 row indices of each split
+        val.npy
+        test.npy
+        meta.json      feature names, classes, split settings, source csv stamp
+
+Loading memory-maps X and y, so training starts with one read instead
+of parsing CSVs. The build is redone automatically when the CSV changes.
+
+    python dataset.py sign_language_data_copper_synth.csv
+"""
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+SPLITS = ("train", "val", "test")
+TEST_SIZE = 0.3        # train / (val + test), as model.py has always split
+SPLIT_SEED = 45
+FORMAT_VERSION = 2
+
+BuiltDataset = namedtuple("BuiltDataset", ["X", "y", "classes", "features", "splits", "meta"])
+
+
+def default_dir(csv_file):
+    return os.path.splitext(csv_file)[0] + ".dataset"
+
+
+def _source_stamp(csv_file):
+    st = os.stat(csv_file)
+    return {"path": os.path.abspath(csv_file), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def split_indices(y, test_size=TEST_SIZE, seed=SPLIT_SEED):
+    """Stratified train/val/test row indices (70/15/15 by default)."""
+    from sklearn.model_selection import train_test_split
+
+    idx = np.arange(len(y))
+    train, temp = train_test_split(idx, test_size=test_size, random_state=seed, stratify=y)
+    test, val = train_test_split(temp, test_size=0.5, random_state=seed, stratify=y[temp])
+    return {"train": np.sort(train), "val": np.sort(val), "test": np.sort(test)}
+
+
+def label_runs(y):
+    """[(start, end)] of maximal runs of equal consecutive labels (recording order)."""
+    change = np.flatnonzero(np.diff(y)) + 1
+    starts = np.concatenate([[0], change])
+    ends = np.concatenate([change, [len(y)]])
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def build(csv_file, out_dir=None, test_size=TEST_SIZE, seed=SPLIT_SEED):
+    """Parse `csv_file` once and write the .npy dataset directory. Returns out_dir."""
+    import pandas as pd
+
+    out_dir = out_dir or default_dir(csv_file)
+    df = pd.read_csv(csv_file)
+    df.columns = [c.strip() for c in df.columns]  # some recordings have "ring_tape "
+    features = [c for c in df.columns if c != "label"]
+    X = df[features].to_numpy(dtype=np.float32)
+    classes, y = np.unique(df["label"].astype(str).to_numpy(), return_inverse=True)
+    y = y.astype(np.int16)
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "X.npy"), X)
+    np.save(os.path.join(out_dir, "y.npy"), y)
+    for name, idx in split_indices(y, test_size, seed).items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), idx.astype(np.int32))
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "features": features,
+        "classes": classes.tolist(),
+        "rows": len(X),
+        "test_size": test_size,
+        "seed": seed,
+        "source": _source_stamp(csv_file),
+    }
+    # meta.json goes last: a directory without it is an interrupted build
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+def is_current(out_dir, csv_file):
+    try:
+        with open(os.path.join(out_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    source = _source_stamp(csv_file)
+    return (meta.get("version") == FORMAT_VERSION
+            and meta["source"]["size"] == source["size"]
+            and meta["source"]["mtime_ns"] == source["mtime_ns"])
+
+
+def ensure_built(path, **kwargs):
+    """Dataset directory for `path` (a CSV or an already built directory), building it if stale."""
+    if os.path.isdir(path):
+        return path
+    out_dir = kwargs.pop("out_dir", None) or default_dir(path)
+    if not is_current(out_dir, path):
+        print(f"[INFO] Building {out_dir} from {path}")
+        build(path, out_dir, **kwargs)
+    return out_dir
+
+
+def load(path, mmap=True):
+    """BuiltDataset for a CSV or dataset directory; X and y are memory-mapped unless mmap=False."""
+    out_dir = ensure_built(path)
+    with open(os.path.join(out_dir, "meta.json")) as f:
+        meta = json.load(f)
+    mode = "r" if mmap else None
+    X = np.load(os.path.join(out_dir, "X.npy"), mmap_mode=mode)
+    y = np.load(os.path.join(out_dir, "y.npy"), mmap_mode=mode)
+    splits = {name: np.load(os.path.join(out_dir, f"{name}.npy")) for name in SPLITS}
+    return BuiltDataset(X, y, np.asarray(meta["classes"]), meta["features"], splits, meta)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv", help="recording csv with a 'label' column")
+    parser.add_argument("--out", default=None, help="dataset directory (default: <csv>.dataset)")
+    parser.add_argument("--test-size", type=float, default=TEST_SIZE)
+    parser.add_argument("--seed", type=int, default=SPLIT_SEED)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    out_dir = build(args.csv, args.out, args.test_size, args.seed)
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    data = load(out_dir)
+    X = np.asarray(data.X[data.splits["train"]])
+    t_load = time.perf_counter() - t0
+
+    print(f"Wrote {out_dir}: {data.meta['rows']} rows x {len(data.features)} features, "
+          f"{len(data.classes)} classes")
+    print("  splits: " + ", ".join(f"{k}={len(v)}" for k, v in data.splits.items()))
+    print(f"  csv parse + build: {1e3 * t_build:.0f} ms, memmap load of train split: {1e3 * t_load:.1f} ms")
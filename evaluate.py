@@ -0,0 +1,219 @@
+"""
+2025 SignWave
+
+Cross-validated accuracy baseline over the repo's datasets.
+
+Every entry in EXPERIMENTS (a recording CSV plus a feature subset) is
+scored with stratified k-fold CV. All folds of all experiments run in
+one process pool. Each fold's predictions are cached under
+.cv_cache/, keyed by the CSV's size/mtime, the feature list, the fold
+and the training config, so a rerun only retrains what changed.
+
+    python evaluate.py                         # every experiment, 5 folds
+    python evaluate.py full_19 flex_only_19 --folds 10 --epochs 30
+    python evaluate.py --list
+
+Per experiment it prints mean/std fold accuracy and per-class
+precision/recall/F1 over the pooled out-of-fold predictions. The full
+report goes to cv_report.json.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+import numpy as np
+
+import dataset
+
+IMU = ["gx", "gy", "gz", "ax", "ay", "az"]
+ATTITUDE = ["roll", "pitch", "yaw"]
+FLEX = ["flex0", "flex1", "flex2", "flex3", "flex4"]
+CONTACTS = ["index_inside", "middle_fingerprint", "middle_inside_to_ring", "ring_tape", "thumbprint"]
+
+# name: (csv, feature columns or None for every column)
+EXPERIMENTS = {
+    "imu_flex_11": ("sign_language_test_data.csv", None),
+    "attitude_14": ("_train.csv", None),
+    "copper_18": ("sign_language_data_copper_synth.csv", None),
+    "full_19": ("__test.csv", None),
+    "no_contacts_19": ("__test.csv", ATTITUDE + IMU + FLEX),
+    "flex_only_19": ("__test.csv", FLEX),
+}
+
+CONFIG = {
+    "hidden": [256, 128, 64, 32],
+    "dropout": 0.3,
+    "n_norm": 2,
+    "epochs": 20,
+    "lr": 1e-3,
+    "weight_decay": 1e-2,
+    "noise_std": 0.02,
+    "batch_size": 64,
+}
+CACHE_DIR = ".cv_cache"
+REPORT = "cv_report.json"
+CACHE_VERSION = 1
+
+
+class _Arrays:
+    """Minimal dataset for model.TensorBatchLoader."""
+
+    def __init__(self, X, y) -> None:
+        self.X, self.y = X, y
+
+    def __len__(self):
+        return len(self.X)
+
+
+def fold_key(name, csv_file, features, k, seed, fold, config):
+    st = os.stat(csv_file)
+    blob = json.dumps({"v": CACHE_VERSION, "csv": [os.path.abspath(csv_file), st.st_size, st.st_mtime_ns],
+                       "features": features, "k": k, "seed": seed, "fold": fold, "config": config},
+                      sort_keys=True)
+    return f"{name}-f{fold}-{hashlib.sha1(blob.encode()).hexdigest()[:12]}"
+
+
+def _init_worker(threads):
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def run_fold(data_dir, columns, train_idx, test_idx, config, seed, cache_file):
+    """Train on train_idx, predict test_idx, save (y_true, y_pred) to cache_file."""
+    import torch
+    from sklearn.preprocessing import StandardScaler
+    import model
+
+    torch.manual_seed(seed)
+    data = dataset.load(data_dir)
+    X = np.asarray(data.X[:, columns], dtype=np.float32)
+    y = np.asarray(data.y, dtype=np.int64)
+
+    scaler = StandardScaler().fit(X[train_idx])
+    X = scaler.transform(X).astype(np.float32)
+    train_ds = _Arrays(torch.from_numpy(X[train_idx]), torch.from_numpy(y[train_idx]))
+    test_X = torch.from_numpy(X[test_idx])
+
+    net = model.SignWaveNetwork(X.shape[1], len(data.classes), hidden=tuple(config["hidden"]),
+                                dropout=config["dropout"], n_norm=config["n_norm"])
+    train_dl = model.TensorBatchLoader(train_ds, batch_size=config["batch_size"], shuffle=True,
+                                       noise_std=config["noise_std"])
+    loss_func = torch.nn.CrossEntropyLoss()
+    optimizer = torch.optim.AdamW(net.parameters(), lr=config["lr"], weight_decay=config["weight_decay"])
+    for _ in range(config["epochs"]):
+        net.train()
+        for xb, yb in train_dl:
+            optimizer.zero_grad()
+            loss_func(net(xb), yb).backward()
+            optimizer.step()
+
+    net.eval()
+    with torch.inference_mode():
+        y_pred = net(test_X).argmax(dim=1).numpy()
+    tmp = cache_file + ".tmp.npz"
+    np.savez(tmp, y_true=y[test_idx], y_pred=y_pred)
+    os.replace(tmp, cache_file)
+    return cache_file
+
+
+def summarize(name, classes, folds):
+    """Fold accuracies plus per-class precision/recall/F1 over the pooled predictions."""
+    from sklearn.metrics import precision_recall_fscore_support
+
+    accs = [float(np.mean(t == p)) for t, p in folds]
+    y_true = np.concatenate([t for t, _ in folds])
+    y_pred = np.concatenate([p for _, p in folds])
+    labels = np.arange(len(classes))
+    precision, recall, f1, support = precision_recall_fscore_support(y_true, y_pred, labels=labels, zero_division=0)
+    return {
+        "experiment": name,
+        "accuracy_mean": float(np.mean(accs)),
+        "accuracy_std": float(np.std(accs)),
+        "fold_accuracy": accs,
+        "per_class": {str(c): {"precision": float(p), "recall": float(r), "f1": float(f), "support": int(s)}
+                      for c, p, r, f, s in zip(classes, precision, recall, f1, support)},
+    }
+
+
+def print_summary(result):
+    print(f"\n{result['experiment']}: {100 * result['accuracy_mean']:.2f}% "
+          f"+/- {100 * result['accuracy_std']:.2f} over {len(result['fold_accuracy'])} folds")
+    print(f"  {'class':>8} {'prec':>6} {'recall':>6} {'f1':>6} {'n':>6}")
+    for c, m in result["per_class"].items():
+        print(f"  {c:>8} {m['precision']:6.3f} {m['recall']:6.3f} {m['f1']:6.3f} {m['support']:6d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("experiments", nargs="*", help="names from EXPERIMENTS (default: all)")
+    parser.add_argument("--list", action="store_true", help="list the experiments and exit")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=45)
+    parser.add_argument("--epochs", type=int, default=CONFIG["epochs"])
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    parser.add_argument("--workers", type=int, default=None, help="default: cpu count / threads")
+    parser.add_argument("--report", default=REPORT)
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (csv_file, features) in EXPERIMENTS.items():
+            print(f"{name:>16}: {csv_file} [{'all columns' if features is None else ', '.join(features)}]")
+        raise SystemExit(0)
+
+    from sklearn.model_selection import StratifiedKFold
+
+    config = dict(CONFIG, epochs=args.epochs)
+    names = args.experiments or list(EXPERIMENTS)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    jobs, plans = [], {}
+    for name in names:
+        csv_file, features = EXPERIMENTS[name]
+        data = dataset.load(csv_file)  # parses the csv only the first time
+        features = list(data.features) if features is None else features
+        columns = [data.features.index(f) for f in features]
+        y = np.asarray(data.y)
+        splitter = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=args.seed)
+        cache_files = []
+        for fold, (train_idx, test_idx) in enumerate(splitter.split(np.zeros(len(y)), y)):
+            key = fold_key(name, csv_file, features, args.folds, args.seed, fold, config)
+            cache_file = os.path.join(CACHE_DIR, key + ".npz")
+            cache_files.append(cache_file)
+            if not os.path.exists(cache_file):
+                jobs.append((dataset.ensure_built(csv_file), columns, train_idx, test_idx, config,
+                             args.seed + fold, cache_file))
+        plans[name] = (data.classes, cache_files)
+
+    cached = sum(len(files) for _, files in plans.values()) - len(jobs)
+    print(f"{len(names)} experiments x {args.folds} folds: {cached} cached, {len(jobs)} to train")
+
+    t0 = time.perf_counter()
+    if jobs:
+        workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+        # spawn: forked children would inherit torch's thread pools from the parent
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(args.threads,)) as pool:
+            futures = [pool.submit(run_fold, *job) for job in jobs]
+            for i, fut in enumerate(as_completed(futures), 1):
+                print(f"[{i}/{len(jobs)}] {os.path.basename(fut.result())}")
+        print(f"Trained {len(jobs)} folds in {time.perf_counter() - t0:.0f}s")
+
+    results = []
+    for name in names:
+        classes, cache_files = plans[name]
+        folds = []
+        for path in cache_files:
+            with np.load(path) as z:
+                folds.append((z["y_true"], z["y_pred"]))
+        result = summarize(name, classes, folds)
+        print_summary(result)
+        results.append(result)
+
+    with open(args.report, "w") as f:
+        json.dump({"config": config, "folds": args.folds, "seed": args.seed, "results": results}, f, indent=2)
+    print(f"\nReport written to {args.report}")
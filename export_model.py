@@ -0,0 +1,149 @@
+"""
+2025 SignWave
+
+Export signwave_model.pth + scaler.pkl + label_encoder.pkl into a single
+self-contained artifact for runtime.py:
+
+    python export_model.py                      # signwave_model.npz
+    python export_model.py --onnx               # also signwave_model.onnx
+    python export_model.py --check              # compare against torch on the test split
+
+The scaler is folded into the first Linear (inference.fuse_scaler) and
+each LayerNorm's gamma/beta into the Linear that follows it, so the NumPy
+runtime only has linear, relu and plain normalization steps left.
+
+The mtimes of the three source files are recorded in the artifact, so
+InferenceService can tell when the checkpoint was retrained after the
+export and the artifact is stale.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import torch
+from torch import nn
+
+import dataset
+import model
+from inference import MODEL_PATH, LABEL_ENC_PATH, SCALER_PATH, fuse_scaler
+from runtime import ARTIFACT_VERSION, OP_LINEAR, OP_NORM, OP_RELU, load_artifact
+
+NPZ_PATH = "signwave_model.npz"
+ONNX_PATH = "signwave_model.onnx"
+
+
+def source_stamp(*paths):
+    """mtime_ns of each checkpoint file an artifact is exported from."""
+    return tuple(os.stat(p).st_mtime_ns for p in paths)
+
+
+def network_ops(net):
+    """Flatten a fused SignWaveNetwork into [(op, params...)] with LayerNorm affines folded forward."""
+    ops = []
+    pending = None  # (gamma, beta) of the last LayerNorm, waiting for the next Linear
+    for layer in net.linear_ReLU_stack:
+        if isinstance(layer, nn.Linear):
+            W = layer.weight.detach().double().numpy()
+            b = layer.bias.detach().double().numpy()
+            if pending is not None:
+                gamma, beta = pending
+                b = b + W @ beta
+                W = W * gamma
+                pending = None
+            ops.append((OP_LINEAR, W.T.astype(np.float32), b.astype(np.float32)))
+        elif isinstance(layer, nn.ReLU):
+            ops.append((OP_RELU,))
+        elif isinstance(layer, nn.LayerNorm):
+            ops.append((OP_NORM, layer.eps))
+            if layer.elementwise_affine:
+                pending = (layer.weight.detach().double().numpy(), layer.bias.detach().double().numpy())
+        elif isinstance(layer, nn.Dropout):
+            continue  # identity at inference
+        else:
+            raise TypeError(f"Cannot export layer {layer!r}")
+    if pending is not None:
+        raise ValueError("LayerNorm at the end of the network has nothing to fold into")
+    return ops
+
+
+def export_npz(net, scaler, label_encoder, path=NPZ_PATH, source=None):
+    fused = fuse_scaler(net, scaler)
+    arrays = {
+        "version": np.int32(ARTIFACT_VERSION),
+        "classes": np.asarray(label_encoder.classes_).astype(str),
+    }
+    if source is not None:
+        arrays["source_mtime"] = np.asarray(source, dtype=np.int64)
+    names = []
+    for i, op in enumerate(network_ops(fused)):
+        names.append(op[0])
+        if op[0] == OP_LINEAR:
+            arrays[f"w{i}"], arrays[f"b{i}"] = op[1], op[2]
+        elif op[0] == OP_NORM:
+            arrays[f"eps{i}"] = np.float64(op[1])
+    arrays["ops"] = np.asarray(names)
+    np.savez(path, **arrays)
+    return path
+
+
+def export_onnx(net, scaler, label_encoder, path=ONNX_PATH, source=None):
+    import onnx
+
+    fused = fuse_scaler(net, scaler)
+    input_dim = fused.linear_ReLU_stack[0].in_features
+    torch.onnx.export(fused, torch.zeros(1, input_dim), path,
+                      input_names=["features"], output_names=["logits"],
+                      dynamic_axes={"features": {0: "batch"}, "logits": {0: "batch"}})
+    proto = onnx.load(path)
+    entry = proto.metadata_props.add()
+    entry.key = "classes"
+    entry.value = json.dumps([str(c) for c in label_encoder.classes_])
+    if source is not None:
+        entry = proto.metadata_props.add()
+        entry.key = "source_mtime"
+        entry.value = json.dumps(list(source))
+    onnx.save(proto, path)
+    return path
+
+
+def check(net, scaler, label_encoder, artifact, rows):
+    """Max probability difference and label agreement of `artifact` vs the torch model."""
+    engine = load_artifact(artifact)
+    with torch.no_grad():
+        logits = net(torch.tensor(scaler.transform(rows), dtype=torch.float32))
+        ref = torch.softmax(logits, dim=1).numpy()
+    labels, probs = engine.predict_batch(rows)
+    ref_labels = label_encoder.classes_[ref.argmax(axis=1)]
+    print(f"{artifact}: max |dp| = {np.abs(probs - ref).max():.2e}, "
+          f"label agreement {100 * np.mean(labels == ref_labels):.2f}% on {len(rows)} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--labels", default=LABEL_ENC_PATH)
+    parser.add_argument("--out", default=NPZ_PATH, help="NumPy artifact path")
+    parser.add_argument("--onnx", nargs="?", const=ONNX_PATH, default=None,
+                        help="also write an ONNX artifact (needs the onnx package)")
+    parser.add_argument("--check", action="store_true",
+                        help="compare the exported artifacts against torch on the test split of --data")
+    parser.add_argument("--data", default=model.DATA_PATH,
+                        help="training recording csv or dataset.py directory (same as model.py --data)")
+    args = parser.parse_args()
+
+    net, scaler, label_encoder = model.load_model(args.model, args.labels, args.scaler, device=torch.device("cpu"))
+    # same order as InferenceService.paths
+    source = source_stamp(args.model, args.labels, args.scaler)
+    written = [export_npz(net, scaler, label_encoder, args.out, source)]
+    if args.onnx:
+        written.append(export_onnx(net, scaler, label_encoder, args.onnx, source))
+    for path in written:
+        print(f"Wrote {path}")
+
+    if args.check:
+        data = dataset.load(args.data)
+        rows = np.asarray(data.X[data.splits["test"]], dtype=np.float32)
+        for path in written:
+            check(net, scaler, label_encoder, path, rows)
@@ -13,6 +13,9 @@ import os
 from icecream import ic
 from ahrs.filters import Madgwick
 from led import led
+from mcp3008 import MCP3008
+from mpu6050 import MPU6050
+import calibration_store
 
 # ---------------------------
 # Configuration
@@ -78,38 +81,43 @@ def setup_mpu(bus):
     bus.write_byte_data(MPU6050_ADDR, PWR_MGMT_1, 0x00)
     time.sleep(0.05)
 
-def calibrate(bus, calibration_time=CALIBRATION_TIME):
+def calibrate(imu, calibration_time=CALIBRATION_TIME):
+    """Measure (hold still) and store a fresh calibration_store.Calibration."""
     print("\nCalibrating... Keep the device steady.")
-    t_end = time.time() + calibration_time
-    gx_sum = gy_sum = gz_sum = 0.0
-    n = 0
-    while time.time() < t_end:
-        gx = read_word(bus, GYRO_XOUT_H) / GYRO_SF
-        gy = read_word(bus, GYRO_XOUT_H + 2) / GYRO_SF
-        gz = read_word(bus, GYRO_XOUT_H + 4) / GYRO_SF
-        gx_sum += gx
-        gy_sum += gy
-        gz_sum += gz
-        n += 1
-        time.sleep(0.002)
-    if n == 0:
-        n = 1
+    cal = calibration_store.measure(imu, calibration_time)
+    calibration_store.save(cal)
     print("Calibration done.\n")
-    return gx_sum/n, gy_sum/n, gz_sum/n
+    return cal
 
 # ---------------------------
 # Data Collector
 # ---------------------------
 class DataCollector:
-    def __init__(self, sample_Hz):
+    def __init__(self, sample_Hz, fifo_Hz=0, imu=None):
+        """fifo_Hz > 0 streams the IMU from its hardware FIFO at that rate
+        and runs the orientation filter on every queued sample.
+        imu defaults to the MPU-6050 on I2C bus 1; pass e.g. a bmi323.BMI323
+        to use that sensor instead."""
         self.spi = open_spi()
+        self.flex_adc = MCP3008(self.spi, FLEX_CHANNELS)
         self.bus = smbus2.SMBus(1)
-        setup_mpu(self.bus)
-        self.fuse = Madgwick()
+        self.imu = imu if imu is not None else MPU6050(self.bus, MPU6050_ADDR, ACCEL_SF, GYRO_SF)
+        self.imu.setup()
+        self.fifo_Hz = fifo_Hz
+        if self.fifo_Hz:
+            self.imu.start_fifo(self.fifo_Hz)
+        self.fuse = self.__new_filter()
         self.q = np.array([1.0, 0.0, 0.0, 0.0])
         self.bias = (0, 0, 0)
+        # a still-valid stored calibration makes samples usable without calibrate()
+        self.calibration = calibration_store.load(sensor=calibration_store.sensor_id(self.imu),
+                                                  temp_c=calibration_store.current_temp(self.imu))
+        self.refiner = None
+        if self.calibration is not None:
+            self.__use_calibration(self.calibration)
         self.sample_Hz = sample_Hz
         self.last_time = time.time()
+        self.last_imu = (0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
 
         # These ones are held at 3.3V
         self.thumb_tape = led(gpio_pin=THUMB_TAPE_PIN, default=1)
@@ -134,33 +142,74 @@ class DataCollector:
         self.index_outside.turn_on()
         # reset orientation state
         self.q = np.array([1.0, 0.0, 0.0, 0.0])
-        self.fuse = Madgwick()
+        self.fuse = self.__new_filter()
         # compute gyro bias
-        self.bias = calibrate(self.bus, calibration_time)
+        self.calibration = calibrate(self.imu, calibration_time)
+        self.__use_calibration(self.calibration)
+        if self.fifo_Hz:
+            # drop what queued up while we were calibrating
+            self.imu.reset_fifo()
         self.last_time = time.time()
 
-    def read_sample(self):
-        bx, by, bz = self.bias
-        ax = read_word(self.bus, ACCEL_XOUT_H) / ACCEL_SF
-        ay = read_word(self.bus, ACCEL_XOUT_H + 2) / ACCEL_SF
-        az = read_word(self.bus, ACCEL_XOUT_H + 4) / ACCEL_SF
-        gx = read_word(self.bus, GYRO_XOUT_H) / GYRO_SF - bx
-        gy = read_word(self.bus, GYRO_XOUT_H + 2) / GYRO_SF - by
-        gz = read_word(self.bus, GYRO_XOUT_H + 4) / GYRO_SF - bz
+    def __use_calibration(self, cal):
+        self.bias = cal.bias
+        self.refiner = calibration_store.BiasRefiner(
+            cal, read_temp=lambda: calibration_store.current_temp(self.imu))
+
+    def __refine(self, samples):
+        """Feed raw (uncorrected) IMU samples to the refiner; picks up a refined bias."""
+        if self.refiner is None:
+            return
+        refined = self.refiner.observe_block(samples)
+        if refined is not None:
+            self.bias = refined
+            self.calibration = self.refiner.cal
 
+    def __new_filter(self):
+        if self.fifo_Hz:
+            return Madgwick(frequency=self.imu.fifo_rate)
+        return Madgwick()
+
+    def __update_orientation(self, ax, ay, az, gx, gy, gz):
         gyr = np.array([gx, gy, gz]) * np.pi / 180.0
         acc = np.array([ax, ay, az])
+        self.q = self.fuse.updateIMU(q=self.q, gyr=gyr, acc=acc)
 
-          # ---- REAL dt calculation ----
-        current = time.time()
-        dt = current - self.last_time
-        self.last_time = current
-        
-        # ---- protect against huge dt spikes (GUI lag, notifications, etc.) ----
-        if dt > 0.2:      # if delayed by >200ms, clamp to normal
-            dt = 1.0 / SAMPLE_HZ
+    def __read_imu_fifo(self):
+        """Filter every sample queued in the FIFO at the hardware period; return the newest."""
+        bx, by, bz = self.bias
+        _, samples = self.imu.read_fifo()
+        self.__refine(samples)
+        for ax, ay, az, gx, gy, gz in samples.tolist():
+            gx -= bx
+            gy -= by
+            gz -= bz
+            self.__update_orientation(ax, ay, az, gx, gy, gz)
+            self.last_imu = (ax, ay, az, gx, gy, gz)
+        return self.last_imu
 
-        self.q = self.fuse.updateIMU(q=self.q, gyr=gyr, acc=acc)
+    def read_sample(self):
+        if self.fifo_Hz:
+            ax, ay, az, gx, gy, gz = self.__read_imu_fifo()
+        else:
+            bx, by, bz = self.bias
+            sample = self.imu.read()
+            self.__refine(sample)
+            ax, ay, az, gx, gy, gz = sample
+            gx -= bx
+            gy -= by
+            gz -= bz
+
+              # ---- REAL dt calculation ----
+            current = time.time()
+            dt = current - self.last_time
+            self.last_time = current
+
+            # ---- protect against huge dt spikes (GUI lag, notifications, etc.) ----
+            if dt > 0.2:      # if delayed by >200ms, clamp to normal
+                dt = 1.0 / SAMPLE_HZ
+
+            self.__update_orientation(ax, ay, az, gx, gy, gz)
 
         # Read copper tape
         index_inside_val = self.index_inside.read_value()
@@ -175,11 +224,13 @@ class DataCollector:
         yaw = math.degrees(math.atan2(2*(self.q[0]*self.q[3] + self.q[1]*self.q[2]),
                                       1 - 2*(self.q[2]**2 + self.q[3]**2)))
 
-        flex_vals = [read_mcp3008_single(self.spi, ch) for ch in FLEX_CHANNELS]
+        flex_vals = self.flex_adc.read()
         #return gx, gy, gz, ax, ay, az, *flex_vals
         return roll, pitch, yaw, gx, gy, gz, ax, ay, az, *flex_vals, index_inside_val, middle_fingerprint_val, middle_inside_to_ring_val, ring_tape_val, thumb_fingerprint_val
 
     def close(self):
+        if self.fifo_Hz:
+            self.imu.stop_fifo()
         self.spi.close()
         self.bus.close()
 
@@ -193,7 +244,7 @@ class SignLanguageGUI:
         self.root.title("Sign Language Data Collector")
         self.root.geometry("700x600")
 
-        self.calibrated = False  # Track whether calibration has been done
+        self.calibrated = self.collector.calibration is not None  # stored calibration still valid
 
         # Instruction Label
         tk.Label(root, text="Select a letter to record:", font=("Arial", 16)).pack(pady=5)
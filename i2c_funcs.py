@@ -1,7 +1,19 @@
 from smbus2 import SMBus, i2c_msg
 import math
+import struct
 import time
 
+import numpy as np
+
+import calibration_store
+from mpu6050 import temp_c
+
+ACCEL_SF = 16384.0
+GYRO_SF = 131.0
+IMU_ACC_X = 0x3B  # ACC X/Y/Z, TEMP, GYR X/Y/Z: 7 big-endian words
+BLOCK_LEN = 14
+_BLOCK = struct.Struct(">7h")
+
 class I2C_SLAVE:
 
     CALIBRATION_TIME = 5
@@ -17,55 +29,71 @@ class I2C_SLAVE:
 
     def read_register(self, reg_addr):
         """Read a 16-bit register from BMI323"""
-        reg_low = self.BUS.read_byte_data(self.I2C_ADDR, reg_addr)
-        reg_high = self.BUS.read_byte_data(self.I2C_ADDR, reg_addr+1)
+        reg_low, reg_high = self.read_block(reg_addr, 2)
         reg = (reg_high<<8) | reg_low
         # Convert to signed
         if (reg >= 2**15):
-            reg = 2**16 - reg
+            reg -= 2**16
         return reg
 
+    def read_block(self, reg_addr, length):
+        """Read `length` consecutive bytes starting at reg_addr in one combined transfer"""
+        write = i2c_msg.write(self.I2C_ADDR, [reg_addr])
+        read = i2c_msg.read(self.I2C_ADDR, length)
+        self.BUS.i2c_rdwr(write, read)
+        return bytes(read)
+
     def write_register(self, reg_addr, value):
         """Write a 16-bit value to a BMI323 register"""
         self.BUS.write_byte_data(self.I2C_ADDR, reg_addr, value)
 
-    def calibrate(self, calib_time):
-        print("\nCalibrating... keep the hand steady")
-        #time.sleep(calib_time)
-        IMU_GYR_X = 0x43
-        IMU_ACC_X = 0x3B
+    def calibrate(self, calib_time, store=calibration_store.CALIBRATION_PATH):
+        """
+        Gyro bias and initial roll/pitch. A still-valid calibration in `store`
+        is used without waiting; otherwise the hand is held steady for
+        calib_time seconds and the result is saved there (store=None: never).
+        """
+        sensor = f"I2C_SLAVE@0x{self.I2C_ADDR:02x}"
+        cal = None
+        if store is not None:
+            temp = temp_c(self.read_raw()[3])
+            cal = calibration_store.load(store, sensor=sensor, temp_c=temp)
+        if cal is None:
+            print("\nCalibrating... keep the hand steady")
+            raw = self.collect(calib_time)
+            samples = np.empty((len(raw), 6))
+            samples[:, :3] = raw[:, 0:3] / ACCEL_SF
+            samples[:, 3:] = raw[:, 4:7] / GYRO_SF
+            cal = calibration_store.from_samples(sensor, samples, temp_c(raw[:, 3]))
+            if store is not None:
+                calibration_store.save(cal, store)
+            print("Calibration done.\n")
+        else:
+            # attitude from where the hand is now, not where it was calibrated
+            ax, ay, az = (np.asarray(self.read_raw()[:3]) / ACCEL_SF).tolist()
+            roll, pitch = self.__accel_to_angles(ax, ay, az)
+            cal = cal._replace(roll=roll, pitch=pitch)
+        self.bx, self.by, self.bz = cal.bias
+        self.r0 = cal.roll
+        self.p0 = cal.pitch
+        return cal
 
-        IMU_GYR_Y = 0x45
-        IMU_ACC_Y = 0x3D
+    def read_raw(self):
+        """(ax, ay, az, temp, gx, gy, gz) raw counts from one 14-byte block read."""
+        return _BLOCK.unpack(self.read_block(IMU_ACC_X, BLOCK_LEN))
 
-        IMU_GYR_Z = 0x47
-        IMU_ACC_Z = 0x3F
-        t_end = time.time() + calib_time
-        gx_sum = gy_sum = gz_sum = 0.0
-        ax_sum = ay_sum = az_sum = 0.0
-        n = 0
+    def collect(self, duration, period=0.002):
+        """Block-read samples for `duration` seconds into an (n, 7) array of raw counts."""
+        rows = []
+        t_end = time.time() + duration
         while time.time() < t_end:
-            ax = self.read_register(IMU_ACC_X) / ACCEL_SF
-            ay = self.read_register(IMU_ACC_Y) / ACCEL_SF
-            az = self.read_register(IMU_ACC_Z) / ACCEL_SF
-            gx = self.read_register(IMU_GYR_X) / GYRO_SF
-            gy = self.read_register(IMU_GYR_Y) / GYRO_SF
-            gz = self.read_register(IMU_GYR_Z) / GYRO_SF
-            ax_sum += ax; ay_sum += ay; az_sum += az
-            gx_sum += gx; gy_sum += gy; gz_sum += gz
-            n += 1
-            time.sleep(0.002)
-        if n == 0: n = 1
-        bx, by, bz = gx_sum/n, gy_sum/n, gz_sum/n
-        ax0, ay0, az0 = ax_sum/n, ay_sum/n, az_sum/n
-        r0, p0 = self.__accel_to_angles(ax0, ay0, az0)
-        print("Calibration done.\n")
-        self.bx = bx
-        self.bz = bz
-        self.by = by
-        self.r0 = r0
-        self.p0 = p0
+            rows.append(self.read_raw())
+            time.sleep(period)
+        if not rows:
+            rows.append(self.read_raw())
+        return np.asarray(rows, dtype=np.float64)
 
+    @staticmethod
     def __accel_to_angles(ax_g, ay_g, az_g):
         roll  = math.degrees(math.atan2(ay_g, az_g if abs(az_g) > 1e-8 else 1e-8))
         pitch = math.degrees(math.atan2(-ax_g, math.sqrt(ay_g*ay_g + az_g*az_g)))
@@ -0,0 +1,372 @@
+"""
+2025 SignWave
+
+Process-wide inference service.
+
+The model, scaler and label encoder are loaded once, warmed up with a
+dummy batch and shared by every thread. A new checkpoint dropped next to
+the old one is picked up by `reload_if_changed` (or the `watch` thread):
+the replacement is fully loaded and warmed before it is swapped in, so a
+running FSM never sees a half-loaded model and never waits on torch.load.
+
+Prediction goes through FusedEngine: the scaler is folded into the first
+Linear layer, inputs are copied into a preallocated tensor and labels are
+looked up in a cached class array, so a single row costs one small
+forward pass and nothing else.
+
+If an exported artifact (export_model.py) is present it is served by
+runtime.py instead, and torch is never imported. An artifact exported
+from an older checkpoint than the one on disk is stale: the checkpoint
+is served with torch instead (or, without torch, the artifact with a
+warning) until export_model.py is re-run.
+"""
+import copy
+import importlib.util
+import os
+import threading
+import time
+
+import numpy as np
+
+import runtime
+
+# imported on first use by _import_torch(); the exported runtimes never need them
+torch = None
+model = None
+
+MODEL_PATH = "signwave_model.pth"
+LABEL_ENC_PATH = "label_encoder.pkl"
+SCALER_PATH = "scaler.pkl"
+ARTIFACT_PATH = "signwave_model.npz"
+QUANT_PATH = "signwave_model_int8.pth"          # written by quantize.py
+QUANT_REPORT_PATH = "quantize_report.json"
+WARMUP_BATCH = 8
+MAX_BATCH = 256
+TORCH_THREADS = 1  # a 19-feature MLP is slower with intra-op threads on the Pi
+
+
+def _import_torch():
+    global torch, model
+    if torch is None:
+        import torch as _torch
+        import model as _model
+        torch, model = _torch, _model
+
+
+def _have_torch():
+    return torch is not None or importlib.util.find_spec("torch") is not None
+
+
+def scaler_affine(scaler):
+    """(a, c) with scaler.transform(x) == a * x + c for StandardScaler/MinMaxScaler."""
+    if hasattr(scaler, "min_") and hasattr(scaler, "scale_"):  # MinMaxScaler
+        return np.asarray(scaler.scale_, np.float64), np.asarray(scaler.min_, np.float64)
+    if hasattr(scaler, "scale_") or hasattr(scaler, "mean_"):  # StandardScaler
+        n = scaler.n_features_in_
+        scale = np.ones(n) if scaler.scale_ is None else np.asarray(scaler.scale_, np.float64)
+        mean = np.zeros(n) if scaler.mean_ is None else np.asarray(scaler.mean_, np.float64)
+        return 1.0 / scale, -mean / scale
+    raise TypeError(f"Cannot fold {type(scaler).__name__} into the network")
+
+
+def fuse_scaler(net, scaler):
+    """
+    Copy of `net` whose first Linear applies the scaler as well:
+    W (a x + c) + b == (W * a) x + (W c + b).
+    """
+    _import_torch()
+    fused = copy.deepcopy(net).eval()
+    first = fused.linear_ReLU_stack[0]
+    a, c = scaler_affine(scaler)
+    with torch.no_grad():
+        W = first.weight.double()
+        first.bias.copy_(first.bias.double() + W @ torch.from_numpy(c))
+        first.weight.copy_(W * torch.from_numpy(a))
+    for p in fused.parameters():
+        p.requires_grad_(False)
+    return fused
+
+
+class FusedEngine:
+
+    def __init__(self, net, scaler, label_encoder, max_batch=MAX_BATCH, stamp=None, fold=True) -> None:
+        """Scaler-folded network with preallocated input buffers
+
+        Parameters
+        ----------
+        net : model.SignWaveNetwork
+            Trained network (left untouched; a fused copy is made)
+        scaler : StandardScaler or MinMaxScaler
+            Feature scaler the network was trained behind
+        label_encoder : LabelEncoder
+            Class index -> label mapping
+        max_batch : Integer
+            Rows held by the preallocated buffer; bigger batches are chunked
+        stamp : tuple, optional
+            Checkpoint file mtimes this engine was built from
+        fold : bool
+            Fold the scaler into the first layer. Pass False for an int8
+            network (quantize.py), whose weights cannot be rescaled; the
+            scaler is then applied in place in the input buffer.
+        """
+        _import_torch()
+        if fold:
+            self.net = fuse_scaler(net, scaler)
+            self.__affine = None
+        else:
+            self.net = net.eval()
+            self.__affine = tuple(v.astype(np.float32) for v in scaler_affine(scaler))
+        self.classes = np.asarray(label_encoder.classes_)
+        self.input_dim = self.net.linear_ReLU_stack[0].in_features
+        self.max_batch = max_batch
+        self.stamp = stamp
+        self.__x = torch.zeros((max_batch, self.input_dim), dtype=torch.float32)
+        self.__x_np = self.__x.numpy()  # shares memory with __x
+        self.__lock = threading.Lock()  # the buffer is shared by every caller
+
+    def __forward(self, n):
+        if self.__affine is not None:
+            x = self.__x_np[:n]
+            x *= self.__affine[0]
+            x += self.__affine[1]
+        with torch.inference_mode():
+            return torch.softmax(self.net(self.__x[:n]), dim=1).numpy()
+
+    def predict_proba(self, X):
+        """(n, n_features) raw (unscaled) features -> (n, n_classes) probabilities."""
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.input_dim)
+        out = np.empty((len(X), len(self.classes)), dtype=np.float32)
+        with self.__lock:
+            for i in range(0, len(X), self.max_batch):
+                chunk = X[i:i + self.max_batch]
+                self.__x_np[:len(chunk)] = chunk
+                out[i:i + len(chunk)] = self.__forward(len(chunk))
+        return out
+
+    def predict_batch(self, X):
+        """Returns (labels (n,), probs (n, n_classes)) for raw feature rows X."""
+        probs = self.predict_proba(X)
+        return self.classes[probs.argmax(axis=1)], probs
+
+    def predict(self, data_row):
+        """(label, confidence) for one raw feature row."""
+        with self.__lock:
+            self.__x_np[0] = data_row
+            probs = self.__forward(1)[0]
+        idx = int(probs.argmax())
+        return self.classes[idx], float(probs[idx])
+
+
+class InferenceService:
+
+    def __init__(self, model_path=MODEL_PATH, label_enc_path=LABEL_ENC_PATH, scaler_path=SCALER_PATH,
+                 artifact_path=ARTIFACT_PATH, int8_tolerance=None) -> None:
+        """Shared, hot-swappable classifier
+
+        Parameters
+        ----------
+        model_path : str
+            state_dict checkpoint written by model.py
+        label_enc_path : str
+            joblib-pickled LabelEncoder
+        scaler_path : str
+            joblib-pickled StandardScaler
+        artifact_path : str or None
+            Exported .npz/.onnx artifact; preferred over the torch
+            checkpoint whenever the file exists and was exported from
+            the checkpoint currently on disk
+        int8_tolerance : float or None
+            Serve the quantize.py int8 model instead of the float one when
+            its test accuracy is at most this far below (e.g. 0.01 = one
+            point). None disables the int8 model.
+        """
+        self.paths = (model_path, label_enc_path, scaler_path)
+        self.artifact_path = artifact_path
+        self.int8_tolerance = int8_tolerance
+        self.__engine = None
+        self.__stale_key = None  # (artifact, checkpoint mtimes) __stale was computed for
+        self.__stale = False
+        self.__load_lock = threading.RLock()
+        self.__watcher = None
+        self.__stop = threading.Event()
+
+    # ---------------------------
+    # Loading
+    # ---------------------------
+    def _artifact_stale(self):
+        """True when the checkpoint files are not the ones the artifact was exported from."""
+        try:
+            key = (os.stat(self.artifact_path).st_mtime_ns, tuple(os.stat(p).st_mtime_ns for p in self.paths))
+        except OSError:
+            return False  # no full checkpoint next to the artifact: nothing to compare against
+        if key != self.__stale_key:
+            source = runtime.artifact_source(self.artifact_path)
+            if source is None:  # exported before sources were recorded: compare against the export time
+                self.__stale = any(m > key[0] for m in key[1])
+            else:
+                self.__stale = tuple(source) != key[1]
+            self.__stale_key = key
+        return self.__stale
+
+    def _use_artifact(self):
+        if self.artifact_path is None or not os.path.exists(self.artifact_path):
+            return False
+        return not (self._artifact_stale() and _have_torch())
+
+    def _use_int8(self):
+        return self.int8_tolerance is not None and os.path.exists(QUANT_PATH) and os.path.exists(QUANT_REPORT_PATH)
+
+    def _stamp(self):
+        if self._use_artifact():
+            # the checkpoint is watched too, so retraining makes the artifact stale and swaps to torch
+            paths = (self.artifact_path,) + tuple(p for p in self.paths if os.path.exists(p))
+        else:
+            paths = self.paths + ((QUANT_PATH, QUANT_REPORT_PATH) if self._use_int8() else ())
+        return tuple(os.stat(p).st_mtime_ns for p in paths)
+
+    def _load_engine(self):
+        stamp = self._stamp()
+        if self._use_artifact():
+            if self._artifact_stale():
+                print(f"[WARN] {self.artifact_path} was exported from an older {self.paths[0]} and torch is "
+                      f"not installed; serving the stale artifact. Re-run export_model.py")
+            engine = runtime.load_artifact(self.artifact_path)
+            engine.stamp = stamp
+        else:
+            if self.artifact_path is not None and os.path.exists(self.artifact_path):
+                print(f"[WARN] {self.artifact_path} was exported from an older {self.paths[0]}; "
+                      f"serving the checkpoint with torch. Re-run export_model.py")
+            _import_torch()
+            torch.set_num_threads(TORCH_THREADS)
+            engine = None
+            if self._use_int8():
+                import quantize
+                if quantize.report_accepts(QUANT_REPORT_PATH, self.int8_tolerance, self.paths):
+                    net, scaler, label_encoder = quantize.load_quantized(QUANT_PATH, *self.paths)
+                    engine = FusedEngine(net, scaler, label_encoder, stamp=stamp, fold=False)
+                else:
+                    print(f"[INFO] int8 model not accepted (stale or outside the {self.int8_tolerance} "
+                          f"accuracy tolerance), using float")
+            if engine is None:
+                net, scaler, label_encoder = model.load_model(*self.paths, device=torch.device("cpu"))
+                engine = FusedEngine(net, scaler, label_encoder, stamp=stamp)
+        self._warmup(engine)
+        return engine
+
+    def _warmup(self, engine):
+        """Run a dummy batch and row so the first real prediction does not pay for lazy init."""
+        engine.predict_batch(np.zeros((WARMUP_BATCH, engine.input_dim), dtype=np.float32))
+        engine.predict(np.zeros(engine.input_dim, dtype=np.float32))
+
+    def load(self):
+        """Load (or reload) the checkpoint and swap it in atomically. Returns self."""
+        with self.__load_lock:
+            t0 = time.perf_counter()
+            engine = self._load_engine()
+            self.__engine = engine  # single reference assignment: readers see old or new, never a mix
+            print(f"[INFO] {type(engine).__name__} loaded in {time.perf_counter() - t0:.2f}s "
+                  f"({len(engine.classes)} classes, {engine.input_dim} features)")
+        return self
+
+    def ensure_loaded(self):
+        if self.__engine is None:
+            with self.__load_lock:
+                if self.__engine is None:
+                    self.load()
+        return self
+
+    @property
+    def loaded(self):
+        return self.__engine is not None
+
+    def reload_if_changed(self):
+        """Hot-swap when any of the checkpoint files changed. Returns True if swapped."""
+        engine = self.__engine
+        try:
+            stamp = self._stamp()
+        except OSError:
+            return False  # mid-copy; try again next poll
+        if engine is not None and stamp == engine.stamp:
+            return False
+        try:
+            self.load()
+        except Exception as e:
+            print(f"[WARN] New checkpoint rejected, keeping the current model: {e}")
+            return False
+        return True
+
+    def watch(self, interval_s=2.0):
+        """Poll the checkpoint files in a daemon thread and hot-swap on change."""
+        if self.__watcher is not None:
+            return
+
+        def run():
+            while not self.__stop.wait(interval_s):
+                self.reload_if_changed()
+
+        self.__watcher = threading.Thread(target=run, name="model-watch", daemon=True)
+        self.__watcher.start()
+
+    def stop(self):
+        self.__stop.set()
+
+    # ---------------------------
+    # Inference
+    # ---------------------------
+    @property
+    def engine(self):
+        return self.ensure_loaded().__engine
+
+    def predict_proba(self, X):
+        """(n, n_features) -> (n, n_classes) probabilities."""
+        return self.engine.predict_proba(X)
+
+    def predict_batch(self, X):
+        """Returns (labels (n,), probs (n, n_classes))."""
+        return self.engine.predict_batch(X)
+
+    def predict(self, data_row, threshold=0.75):
+        """
+        data_row: list or np.array of shape (num_features,)
+        Returns (label, confidence) like model.predict.
+        """
+        return self.engine.predict(data_row)
+
+
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_service(**kwargs):
+    """The process-wide InferenceService (created, not loaded, on first call with these InferenceService args)."""
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = InferenceService(**kwargs)
+        return _SERVICE
+
+
+if __name__ == "__main__":
+    N = 2000
+    _import_torch()
+    service = InferenceService(artifact_path=None).load()
+    net, scaler, label_encoder = model.load_model(*service.paths)
+    rows = np.random.default_rng(0).normal(500, 200, (N, service.engine.input_dim)).astype(np.float32)
+
+    t0 = time.perf_counter()
+    ref = [model.predict(net, scaler, label_encoder, r)[0] for r in rows]
+    t_ref = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fused = [service.predict(r)[0] for r in rows]
+    t_row = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    labels, _ = service.predict_batch(rows)
+    t_batch = time.perf_counter() - t0
+
+    agree = np.mean(np.asarray(ref) == np.asarray(fused))
+    print(f"model.predict:  {1e6 * t_ref / N:8.1f} us/sample")
+    print(f"engine.predict: {1e6 * t_row / N:8.1f} us/sample")
+    print(f"predict_batch:  {1e6 * t_batch / N:8.1f} us/sample ({N} rows)")
+    print(f"label agreement: {100 * agree:.2f}%")
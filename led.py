@@ -1,8 +1,86 @@
 import lgpio as gpio
+import heapq
+import itertools
 import time
 import threading
 
 
+def blink(on_s, off_s, count, value=1):
+    """Pattern of `count` on/off cycles, ending off."""
+    return ((value, on_s), (0, off_s)) * count
+
+
+class PatternScheduler:
+    """
+    One background thread that plays declarative on/off patterns on led objects.
+
+    A pattern is a sequence of (value, hold_s) steps: set the output, then hold it.
+    Every step goes into a single deadline heap, so any number of blinking LEDs and
+    timed pulses share one thread and nobody sleeps in a request handler.
+    A new pattern on an led replaces whatever it was playing; the same pattern
+    requested again while it is still playing is coalesced into the running one.
+    """
+
+    def __init__(self) -> None:
+        self.__heap = []              # (deadline, seq, target, generation, value)
+        self.__seq = itertools.count()
+        self.__playing = {}           # target -> (generation, pattern, end)
+        self.__generation = itertools.count(1)
+        self.__cond = threading.Condition()
+        self.__thread = None
+
+    def play(self, target, pattern, start=None):
+        """Play `pattern` on `target` from `start` (time.monotonic(); default now). Returns immediately."""
+        pattern = tuple((int(v), float(s)) for v, s in pattern)
+        now = time.monotonic()
+        start = now if start is None else start
+        with self.__cond:
+            current = self.__playing.get(target)
+            if current is not None and current[1] == pattern and current[2] > now:
+                return
+            gen = next(self.__generation)
+            t = start
+            for value, hold in pattern:
+                heapq.heappush(self.__heap, (t, next(self.__seq), target, gen, value))
+                t += hold
+            self.__playing[target] = (gen, pattern, t)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="led-patterns", daemon=True)
+                self.__thread.start()
+            self.__cond.notify()
+
+    def cancel(self, target, value=None):
+        """
+        Drop the rest of `target`'s pattern and, if `value` is given, set it. Both happen
+        under the scheduler lock, so no step of the old pattern can land after the write.
+        """
+        with self.__cond:
+            self.__playing.pop(target, None)
+            if value is not None:
+                target._set(value)
+
+    def busy(self, target):
+        current = self.__playing.get(target)
+        return current is not None and current[2] > time.monotonic()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while not self.__heap or self.__heap[0][0] > time.monotonic():
+                    self.__cond.wait(self.__heap[0][0] - time.monotonic() if self.__heap else None)
+                _, _, target, gen, value = heapq.heappop(self.__heap)
+                current = self.__playing.get(target)
+                if current is None or current[0] != gen:
+                    continue  # superseded or cancelled
+                if not any(e[2] is target and e[3] == gen for e in self.__heap):
+                    del self.__playing[target]
+                # written under the lock (a GPIO write is short) so cancel() cannot slip in between
+                target._set(value)
+
+
+SCHEDULER = PatternScheduler()
+
+
 class led:
     def __init__(self, gpio_pin, active_high = 1, default = 0, is_input = 0) -> None:
         self.gpio_pin = gpio_pin
@@ -27,16 +105,22 @@ class led:
             gpio.gpio_claim_input(self.gpio_chip, self.gpio_pin, gpio.SET_PULL_DOWN)
 
     
+    def _set(self, on):
+        gpio.gpio_write(self.gpio_chip, self.gpio_pin, int(bool(on) == bool(self.active_high)))
+
     def turn_on(self, duration=-1.0):
         if self.is_input:
             return
-        gpio.gpio_write(self.gpio_chip, self.gpio_pin, 1 if self.active_high else 0)
         if duration != -1:
-            threading.Thread(target=self.__turn_off_auto, args=[duration], daemon=True).start()
+            SCHEDULER.play(self, ((1, duration), (0, 0)))
+            return
+        SCHEDULER.cancel(self, 1)
 
-    def __turn_off_auto(self, duration):
-         time.sleep(duration)
-         self.turn_off()
+    def play(self, pattern, start=None):
+        """Play a (value, hold_s) pattern in the background, see PatternScheduler."""
+        if self.is_input:
+            return
+        SCHEDULER.play(self, pattern, start)
     
     def read_value(self):
         return gpio.gpio_read(self.gpio_chip, self.gpio_pin)
@@ -44,7 +128,7 @@ class led:
     def turn_off(self):
         if self.is_input:
             return
-        gpio.gpio_write(self.gpio_chip, self.gpio_pin, 0 if self.active_high else 1)
+        SCHEDULER.cancel(self, 0)
 
     def cleanup(self):
         gpio.gpiochip_close(self.gpio_chip)
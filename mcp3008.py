@@ -0,0 +1,179 @@
+"""
+2025 SignWave
+
+MCP3008 burst reader.
+
+Reads every configured channel (optionally N times each for oversampling)
+in a single SPI_IOC_MESSAGE ioctl instead of one `xfer2` call per channel.
+The MCP3008 only starts a new conversion on a falling CS edge, so one plain
+`xfer2` cannot carry several conversions; instead each 3-byte conversion is
+its own segment of the same kernel message with `cs_change` set, which
+toggles CS between segments while still costing one syscall.
+"""
+import ctypes
+import fcntl
+import time
+
+import numpy as np
+
+SPI_IOC_MAGIC = ord("k")
+SPI_IOC_TRANSFER_SIZE = 32  # sizeof(struct spi_ioc_transfer)
+MAX_CONVERSIONS = (1 << 14) // SPI_IOC_TRANSFER_SIZE - 1
+
+
+class _spi_ioc_transfer(ctypes.Structure):
+    _fields_ = [
+        ("tx_buf", ctypes.c_uint64),
+        ("rx_buf", ctypes.c_uint64),
+        ("len", ctypes.c_uint32),
+        ("speed_hz", ctypes.c_uint32),
+        ("delay_usecs", ctypes.c_uint16),
+        ("bits_per_word", ctypes.c_uint8),
+        ("cs_change", ctypes.c_uint8),
+        ("tx_nbits", ctypes.c_uint8),
+        ("rx_nbits", ctypes.c_uint8),
+        ("word_delay_usecs", ctypes.c_uint8),
+        ("pad", ctypes.c_uint8),
+    ]
+
+
+def SPI_IOC_MESSAGE(n):
+    """_IOW('k', 0, char[n * sizeof(struct spi_ioc_transfer)])"""
+    return (1 << 30) | ((n * SPI_IOC_TRANSFER_SIZE) << 16) | (SPI_IOC_MAGIC << 8)
+
+
+def read_mcp3008_single(spi, ch):
+    """Legacy single-channel read: one xfer2 per conversion."""
+    cmd1 = 0x01
+    cmd2 = 0x80 | (ch << 4)
+    resp = spi.xfer2([cmd1, cmd2, 0x00])
+    return ((resp[1] & 0x03) << 8) | resp[2]
+
+
+class MCP3008:
+
+    def __init__(self, spi, channels=(0, 1, 2, 3, 4), oversample=1, speed_hz=0) -> None:
+        """Prepare a burst read of `channels` on an open SPI handle
+
+        Parameters
+        ----------
+        spi : spidev.SpiDev (or anything with `xfer2`)
+            Open SPI handle. If it exposes `fileno()` the burst is issued as
+            one SPI_IOC_MESSAGE ioctl; otherwise (mocks) the whole command
+            buffer goes through a single `xfer2` call.
+        channels : sequence of int (0..7)
+            Single-ended channels to convert, in output order
+        oversample : int
+            Conversions per channel; results are averaged
+        speed_hz : int
+            Per-transfer clock override, 0 keeps the handle's max_speed_hz
+        """
+        self.spi = spi
+        self.channels = list(channels)
+        self.oversample = max(1, int(oversample))
+        self.n_conv = len(self.channels) * self.oversample
+        if self.n_conv > MAX_CONVERSIONS:
+            raise ValueError(f"burst of {self.n_conv} conversions exceeds {MAX_CONVERSIONS}")
+
+        cmd = []
+        for _ in range(self.oversample):
+            for ch in self.channels:
+                cmd += [0x01, 0x80 | (ch << 4), 0x00]
+        self.cmd = cmd
+
+        self.__use_ioctl = hasattr(spi, "fileno")
+        if self.__use_ioctl:
+            self.__prepare_ioctl(speed_hz)
+
+    def __prepare_ioctl(self, speed_hz):
+        n = self.n_conv
+        self.__tx = (ctypes.c_uint8 * (3 * n)).from_buffer_copy(bytes(self.cmd))
+        self.__rx = (ctypes.c_uint8 * (3 * n))()
+        self.__xfers = (_spi_ioc_transfer * n)()
+        tx_addr = ctypes.addressof(self.__tx)
+        rx_addr = ctypes.addressof(self.__rx)
+        for i in range(n):
+            x = self.__xfers[i]
+            x.tx_buf = tx_addr + 3 * i
+            x.rx_buf = rx_addr + 3 * i
+            x.len = 3
+            x.speed_hz = speed_hz
+            x.bits_per_word = 8
+            # release CS after every conversion except the last one
+            x.cs_change = 1 if i < n - 1 else 0
+        self.__request = SPI_IOC_MESSAGE(n)
+
+    def __transfer(self):
+        """Run the burst; returns the raw response bytes (3 per conversion)."""
+        if self.__use_ioctl:
+            try:
+                fcntl.ioctl(self.spi.fileno(), self.__request, self.__xfers)
+                return bytes(self.__rx)
+            except OSError as e:
+                print(f"[WARN] MCP3008 burst ioctl failed, using per-channel xfer2: {e}")
+                self.__use_ioctl = False
+                resp = []
+                for i in range(self.n_conv):
+                    resp += self.spi.xfer2(self.cmd[3 * i:3 * i + 3])
+                return resp
+        return self.spi.xfer2(list(self.cmd))
+
+    def read(self):
+        """All channels as a list: ints, or floats when oversampling."""
+        if self.oversample > 1:
+            return self.read_array().tolist()
+        rx = self.__transfer()
+        return [((rx[i + 1] & 0x03) << 8) | rx[i + 2] for i in range(0, len(rx), 3)]
+
+    def read_array(self):
+        """All channels as a float32 array (averaged when oversampling)."""
+        rx = np.asarray(self.__transfer(), dtype=np.uint8).reshape(self.n_conv, 3)
+        counts = ((rx[:, 1].astype(np.uint16) & 0x03) << 8) | rx[:, 2]
+        if self.oversample == 1:
+            return counts.astype(np.float32)
+        return counts.reshape(self.oversample, -1).mean(axis=0, dtype=np.float32)
+
+
+class MockSPI:
+    """In-memory SPI handle answering MCP3008 commands; counts bus transactions."""
+
+    def __init__(self, values=None):
+        self.values = values or (lambda ch: (ch * 128 + 17) & 0x3FF)
+        self.transactions = 0
+        self.bytes = 0
+
+    def xfer2(self, data):
+        self.transactions += 1
+        self.bytes += len(data)
+        resp = []
+        for i in range(0, len(data), 3):
+            ch = (data[i + 1] >> 4) & 0x07
+            val = int(self.values(ch))
+            resp += [0x00, (val >> 8) & 0x03, val & 0xFF]
+        return resp
+
+    def close(self):
+        pass
+
+
+if __name__ == "__main__":
+    N = 20_000
+    channels = [0, 1, 2, 3, 4]
+
+    spi = MockSPI()
+    t0 = time.perf_counter()
+    for _ in range(N):
+        legacy = [read_mcp3008_single(spi, ch) for ch in channels]
+    t_legacy = time.perf_counter() - t0
+    legacy_tx = spi.transactions
+
+    spi = MockSPI()
+    adc = MCP3008(spi, channels)
+    t0 = time.perf_counter()
+    for _ in range(N):
+        burst = adc.read()
+    t_burst = time.perf_counter() - t0
+    assert burst == legacy, (burst, legacy)
+
+    print(f"per-channel: {legacy_tx / N:.0f} transactions/frame, {1e6 * t_legacy / N:.1f} us/frame")
+    print(f"burst:       {spi.transactions / N:.0f} transactions/frame, {1e6 * t_burst / N:.1f} us/frame")
@@ -0,0 +1,143 @@
+"""
+2025 SignWave
+
+Hot-path timing instrumentation.
+
+Fixed-bucket histograms (no allocation per observation) and counters,
+rendered in the Prometheus text exposition format for a /metrics
+endpoint, plus a compact summary for socket status events.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# seconds; covers a single register read up to a stalled emit
+DEFAULT_BUCKETS = (5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """
+    Prometheus-style histogram. Safe to feed from several threads: observe() and
+    the readers share one lock, so the buckets, sum and count always agree.
+    """
+
+    def __init__(self, name, help_text="", buckets=DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.__lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self.__lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self):
+        """Consistent (counts, sum, count, max) copy."""
+        with self.__lock:
+            return list(self.counts), self.sum, self.count, self.max
+
+    @contextmanager
+    def time(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0)
+
+    def quantile(self, q, snap=None):
+        """Upper bucket bound containing quantile q (coarse, but cheap)."""
+        counts, _, count, max_ = snap or self.snapshot()
+        if not count:
+            return 0.0
+        target = q * count
+        seen = 0
+        for bound, n in zip(self.buckets, counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return max_
+
+    def summary(self):
+        snap = self.snapshot()
+        _, total, count, max_ = snap
+        mean = total / count if count else 0.0
+        return {
+            "count": count,
+            "mean_ms": round(1e3 * mean, 3),
+            "p50_ms": round(1e3 * self.quantile(0.5, snap), 3),
+            "p99_ms": round(1e3 * self.quantile(0.99, snap), 3),
+            "max_ms": round(1e3 * max_, 3),
+        }
+
+    def render(self, prefix):
+        counts, total, count, _ = self.snapshot()
+        name = prefix + self.name
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{name}_sum {total:.9f}")
+        lines.append(f"{name}_count {count}")
+        return lines
+
+
+class Metrics:
+    """Named histograms, counters and gauges with one Prometheus renderer."""
+
+    def __init__(self, prefix="signwave_") -> None:
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.__lock = threading.Lock()
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        with self.__lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(name, help_text, buckets)
+            return self.histograms[name]
+
+    def inc(self, name, amount=1, help_text=""):
+        # counters are bumped from several threads too (both FSMs count samples)
+        with self.__lock:
+            self.counters.setdefault(name, [0, help_text])[0] += amount
+
+    def set(self, name, value, help_text=""):
+        self.gauges[name] = [value, help_text]
+
+    def summary(self):
+        out = {name: h.summary() for name, h in self.histograms.items()}
+        with self.__lock:
+            out.update({name: v for name, (v, _) in self.counters.items()})
+        out.update({name: v for name, (v, _) in self.gauges.items()})
+        return out
+
+    def render(self):
+        lines = []
+        for h in list(self.histograms.values()):
+            lines += h.render(self.prefix)
+        with self.__lock:
+            counters = [(name, value, help_text) for name, (value, help_text) in self.counters.items()]
+        for name, value, help_text in counters:
+            full = self.prefix + name + "_total"
+            lines += [f"# HELP {full} {help_text}", f"# TYPE {full} counter", f"{full} {value}"]
+        for name, (value, help_text) in list(self.gauges.items()):
+            full = self.prefix + name
+            lines += [f"# HELP {full} {help_text}", f"# TYPE {full} gauge", f"{full} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
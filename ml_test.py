@@ -11,6 +11,9 @@ import smbus2
 import spidev
 from ahrs.filters import Madgwick
 from model import SignWaveNetwork  # your model definition
+from mcp3008 import MCP3008
+from mpu6050 import MPU6050
+import calibration_store
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 import os
@@ -63,21 +66,10 @@ def setup_mpu(bus):
     bus.write_byte_data(MPU6050_ADDR, PWR_MGMT_1, 0x00)
     time.sleep(0.05)
 
-def calibrate_gyro(bus):
-    print("Calibrating IMU... Keep still")
-    t_end = time.time()+1.0
-    gx_sum = gy_sum = gz_sum = 0.0
-    n = 0
-    while time.time() < t_end:
-        gx = read_word(bus, GYRO_XOUT_H)/GYRO_SF
-        gy = read_word(bus, GYRO_XOUT_H+2)/GYRO_SF
-        gz = read_word(bus, GYRO_XOUT_H+4)/GYRO_SF
-        gx_sum += gx; gy_sum += gy; gz_sum += gz
-        n += 1
-        time.sleep(0.002)
-    if n == 0: n = 1
-    print("Done.")
-    return gx_sum/n, gy_sum/n, gz_sum/n
+def calibrate_gyro(imu):
+    """Stored calibration if still valid, else a 1 s hold-still measurement (then stored)."""
+    cal, _ = calibration_store.load_or_measure(imu, 1.0)
+    return cal
 
 # ---------------------------
 # Model Prediction
@@ -126,15 +118,20 @@ class LiveTestGUI:
 
         # Hardware
         self.spi = open_spi()
+        self.flex_adc = MCP3008(self.spi, FLEX_CHANNELS)
         self.bus = smbus2.SMBus(1)
-        setup_mpu(self.bus)
+        self.imu = MPU6050(self.bus, MPU6050_ADDR, ACCEL_SF, GYRO_SF)
+        self.imu.setup()
 
         # Filter
         self.fuse = Madgwick()
         self.q = np.array([1.0, 0.0, 0.0, 0.0])
 
         # Calibrate
-        self.bias = calibrate_gyro(self.bus)
+        cal = calibrate_gyro(self.imu)
+        self.bias = cal.bias
+        self.refiner = calibration_store.BiasRefiner(
+            cal, read_temp=lambda: calibration_store.current_temp(self.imu))
 
         # Model bits
         self.model, self.scaler, self.label_encoder, self.device = load_inference_components()
@@ -155,14 +152,15 @@ class LiveTestGUI:
         self.update_prediction()
 
     def read_data(self):
+        sample = self.imu.read()
+        refined = self.refiner.observe(sample)
+        if refined is not None:
+            self.bias = refined
         bx, by, bz = self.bias
-        ax = read_word(self.bus, ACCEL_XOUT_H)     / ACCEL_SF
-        ay = read_word(self.bus, ACCEL_XOUT_H + 2) / ACCEL_SF
-        az = read_word(self.bus, ACCEL_XOUT_H + 4) / ACCEL_SF
-
-        gx = read_word(self.bus, GYRO_XOUT_H)     / GYRO_SF - bx
-        gy = read_word(self.bus, GYRO_XOUT_H + 2) / GYRO_SF - by
-        gz = read_word(self.bus, GYRO_XOUT_H + 4) / GYRO_SF - bz
+        ax, ay, az, gx, gy, gz = sample
+        gx -= bx
+        gy -= by
+        gz -= bz
 
         # Madgwick update
         gyr = np.array([gx, gy, gz]) * np.pi / 180.0
@@ -175,7 +173,7 @@ class LiveTestGUI:
         yaw = math.degrees(math.atan2(2*(self.q[0]*self.q[3] + self.q[1]*self.q[2]),
                                       1 - 2*(self.q[2]**2 + self.q[3]**2)))
 
-        flex = [read_mcp3008_single(self.spi, ch) for ch in FLEX_CHANNELS]
+        flex = self.flex_adc.read()
         return [roll, pitch, yaw, gx, gy, gz, ax, ay, az, *flex]
 
     def update_prediction(self):
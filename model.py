@@ -1,24 +1,29 @@
 import torch
 import numpy as np
-import matplotlib.pyplot as plt
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset
 from torch import nn
-import pandas as pd
-from sklearn.metrics import classification_report, confusion_matrix
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from icecream import ic
-import seaborn as sns
 import joblib
 import argparse
-from torchviz import make_dot
+# Training/plotting dependencies (pandas, sklearn, matplotlib, seaborn,
+# torchviz, icecream) are imported inside the functions that use them so
+# that the server, which only needs SignWaveNetwork/load_model/predict,
+# does not pay for them at import time.
+
+TRAIN_NOISE_STD = 0.02  # gaussian noise added to the (scaled) training features
+HIDDEN = (256, 128, 64, 32)
+DROPOUT = 0.3
+N_NORM = 2  # hidden layers followed by a LayerNorm, counted from the input
+DATA_PATH = "sign_language_data_synth.csv"  # default training recording (dataset.py builds its splits)
+
+# overwritten in __main__; module-level so train/validate work when imported (sweep.py)
+device = torch.device("cpu")
 
 def train(dataloader, model, loss_func, optimizer):
+    """One epoch. Noise augmentation is done by the loader (TensorBatchLoader(noise_std=...))."""
     size = len(dataloader.dataset)
     model.train(mode=True)
     for batch, (X, y) in enumerate(dataloader):
-        noisy_X = X + 0.02*torch.randn_like(X)
-        noisy_X, y = noisy_X.to(device), y.to(device)
+        noisy_X, y = X.to(device), y.to(device)
 
         optimizer.zero_grad()
 
@@ -32,11 +37,20 @@ def train(dataloader, model, loss_func, optimizer):
             loss, current = loss.item(), (batch+1)*len(noisy_X)
             print(f"Batch:{batch}|loss: {loss:8f} [{current}|{size}]")
 
-def test(dataloader, model, label_encoder):
+def test(dataloader, model, label_encoder, cm_file=None):
     """
     Evaluate the model on a test DataLoader and print a classification report
     and show a labeled confusion matrix.
+    If cm_file is given nothing is shown: the plot is saved there (plus a
+    .csv of the counts and a .txt of the report) so training runs headless.
     """
+    if cm_file:
+        import matplotlib
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import classification_report, confusion_matrix
+
     model.eval()
     all_preds = []
     all_labels = []
@@ -54,8 +68,9 @@ def test(dataloader, model, label_encoder):
     class_names = label_encoder.classes_
 
     # ---- Print Classification Report ----
+    report = classification_report(all_labels, all_preds, target_names=class_names)
     print("\nClassification Report:\n")
-    print(classification_report(all_labels, all_preds, target_names=class_names))
+    print(report)
 
     # ---- Create Confusion Matrix ----
     cm = confusion_matrix(all_labels, all_preds)
@@ -68,7 +83,17 @@ def test(dataloader, model, label_encoder):
     plt.ylabel("True Label")
     plt.title("Sign Language Gesture Confusion Matrix")
     plt.tight_layout()
-    plt.show()
+    if cm_file:
+        import os
+        stem = os.path.splitext(cm_file)[0]
+        plt.savefig(cm_file, dpi=120)
+        plt.close()
+        np.savetxt(stem + ".csv", cm, fmt="%d", delimiter=",", header=",".join(map(str, class_names)))
+        with open(stem + ".txt", "w") as f:
+            f.write(report)
+        print(f"Confusion matrix written to {cm_file}")
+    else:
+        plt.show()
 
 def validate(dataloader, model, loss_func):
     size = len(dataloader.dataset)
@@ -85,13 +110,104 @@ def validate(dataloader, model, loss_func):
     test_loss /= num_batches
     correct /= size
     print(f"Test Error: \n Accuracy: {(100*correct):>0.1f}%, Avg loss: {test_loss:>8f} \n")
+    return test_loss, correct
+
+def rng_state():
+    import random
+    return {"torch": torch.get_rng_state(), "numpy": np.random.get_state(), "python": random.getstate()}
+
+def set_rng_state(state):
+    import random
+    torch.set_rng_state(state["torch"])
+    np.random.set_state(state["numpy"])
+    random.setstate(state["python"])
+
+def save_checkpoint(path, **state):
+    """torch.save via a temp file + rename, so a crash mid-write never leaves a corrupt checkpoint."""
+    import os
+    tmp = path + ".tmp"
+    torch.save(state, tmp)
+    os.replace(tmp, path)
+
+def fit(model, train_dataloader, valid_dataloader, epochs, learning_rate=1e-4, weight_decay=1e-2, verbose=True,
+        patience=None, checkpoint_path=None, resume=False, best_path=None):
+    """
+    Train with AdamW for up to `epochs`, keeping the weights with the lowest
+    validation loss. Returns the best (validation loss, validation accuracy)
+    and leaves `model` holding the best weights.
+
+    patience: stop after this many epochs without a validation-loss improvement (None = never)
+    checkpoint_path: after every epoch, save model/optimizer/best/RNG state here
+    resume: continue from checkpoint_path if it exists
+    best_path: also write the best state_dict here whenever it improves
+    """
+    import contextlib, copy, io, os
+
+    loss_func = nn.CrossEntropyLoss()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate, weight_decay=weight_decay)
+    start_epoch, best, best_state, best_epoch, bad_epochs = 0, (float("inf"), 0.0), None, -1, 0
+
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        ckpt = torch.load(checkpoint_path, map_location=device, weights_only=False)
+        model.load_state_dict(ckpt["model_state"])
+        optimizer.load_state_dict(ckpt["optimizer_state"])
+        set_rng_state(ckpt["rng"])
+        start_epoch, best, best_state = ckpt["epoch"] + 1, tuple(ckpt["best"]), ckpt["best_state"]
+        best_epoch, bad_epochs = ckpt["best_epoch"], ckpt["bad_epochs"]
+        if verbose:
+            print(f"Resuming at epoch {start_epoch + 1} (best val loss {best[0]:.6f} at epoch {best_epoch + 1})")
+
+    for t in range(start_epoch, epochs):
+        if patience is not None and bad_epochs >= patience:
+            break
+        # train/validate print progress; keep sweep workers quiet
+        with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+            if verbose:
+                print(f"Epoch {t+1}\n--------------------------------------------")
+            train(train_dataloader, model, loss_func, optimizer)
+            result = validate(valid_dataloader, model, loss_func)
+
+        if result[0] < best[0]:
+            best, best_epoch, bad_epochs = result, t, 0
+            best_state = copy.deepcopy(model.state_dict())
+            if best_path:
+                torch.save(best_state, best_path)
+        else:
+            bad_epochs += 1
+
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, epoch=t, model_state=model.state_dict(),
+                            optimizer_state=optimizer.state_dict(), rng=rng_state(),
+                            best=best, best_state=best_state, best_epoch=best_epoch, bad_epochs=bad_epochs,
+                            learning_rate=learning_rate, weight_decay=weight_decay)
+
+    if patience is not None and bad_epochs >= patience and verbose:
+        print(f"Early stop: no improvement for {patience} epochs, best was epoch {best_epoch + 1}")
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    return best
 
 
 class SignLanguageDataset(Dataset):
-    def __init__(self, csv_file, scaler=None,label_encoder=None, fit=False):
-        df = pd.read_csv(csv_file)
-        X = df.drop(columns=["label"]).values.astype(np.float32)
-        y = df["label"].values
+    def __init__(self, csv_file, scaler=None,label_encoder=None, fit=False, split=None):
+        """
+        csv_file: recording csv, or a dataset directory built by dataset.py
+        split: "train"/"val"/"test" to take that split of the built dataset
+               (built from csv_file on first use); None reads the whole csv
+        """
+        from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+        if split is not None:
+            import dataset
+            data = dataset.load(csv_file)
+            rows = data.splits[split]
+            X = np.asarray(data.X[rows], dtype=np.float32)  # one gather out of the memmap
+            y = data.classes[data.y[rows]]
+        else:
+            import pandas as pd
+            df = pd.read_csv(csv_file)
+            X = df.drop(columns=["label"]).values.astype(np.float32)
+            y = df["label"].values
 
         # Encode labels (A–Z)
         if fit:
@@ -118,31 +234,59 @@ class SignLanguageDataset(Dataset):
     def __getitem__(self, idx):
         return self.X[idx], self.y[idx]
 
+class TensorBatchLoader:
+    """
+    DataLoader replacement for datasets that already sit in one tensor
+    (SignLanguageDataset.X / .y). Each epoch does a single shuffled gather
+    and one noise draw, and batches are slices of that, so there is no
+    per-item __getitem__ or collate work.
+    """
+
+    def __init__(self, dataset, batch_size=32, shuffle=False, noise_std=0.0, drop_last=False,
+                 device=None, generator=None) -> None:
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.noise_std = noise_std
+        self.drop_last = drop_last
+        self.generator = generator
+        self.X = dataset.X if device is None else dataset.X.to(device)
+        self.y = dataset.y if device is None else dataset.y.to(device)
+
+    def __len__(self):
+        n = len(self.X)
+        return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+    def __iter__(self):
+        X, y = self.X, self.y
+        if self.shuffle:
+            order = torch.randperm(len(X), generator=self.generator).to(X.device)
+            X, y = X[order], y[order]
+        if self.noise_std:
+            noise = torch.randn(X.shape, generator=self.generator).to(X.device)
+            X = X + self.noise_std * noise
+        end = len(self) * self.batch_size if self.drop_last else len(X)
+        for i in range(0, end, self.batch_size):
+            yield X[i:i + self.batch_size], y[i:i + self.batch_size]
+
 class SignWaveNetwork(nn.Module):
-    def __init__(self, input_dim, num_classes):
+    def __init__(self, input_dim, num_classes, hidden=HIDDEN, dropout=DROPOUT, n_norm=N_NORM):
+        """
+        Each hidden layer is Linear -> ReLU [-> LayerNorm] -> Dropout.
+        The defaults are the original 256/128/64/32 network, so existing
+        checkpoints keep loading with the same state_dict keys.
+        """
         super(SignWaveNetwork, self).__init__()
-        self.linear_ReLU_stack = nn.Sequential(
-            nn.Linear(input_dim, 256),
-            nn.ReLU(),
-            nn.LayerNorm(256),
-            nn.Dropout(0.3),
-            nn.Linear(256, 128),
-            nn.ReLU(),
-            nn.LayerNorm(128),
-            nn.Dropout(0.3),
-            #nn.ReLU(),
-            #nn.Linear(128, 128),
-            #nn.ReLU(),
-            #nn.LayerNorm(128),
-            #nn.Dropout(0.3),
-            nn.Linear(128, 64),
-            nn.ReLU(),
-            nn.Dropout(0.3),
-            nn.Linear(64, 32),
-            nn.ReLU(),
-            nn.Dropout(0.3),
-            nn.Linear(32, num_classes)
-        )
+        layers = []
+        width_in = input_dim
+        for i, width in enumerate(hidden):
+            layers += [nn.Linear(width_in, width), nn.ReLU()]
+            if i < n_norm:
+                layers.append(nn.LayerNorm(width))
+            layers.append(nn.Dropout(dropout))
+            width_in = width
+        layers.append(nn.Linear(width_in, num_classes))
+        self.linear_ReLU_stack = nn.Sequential(*layers)
 
     def forward(self, x):
         return self.linear_ReLU_stack(x)
@@ -151,14 +295,22 @@ class SignWaveNetwork(nn.Module):
 # ---------------------------
 # Inference
 # ---------------------------
-def load_model(model_path="signwave_model.pth", label_enc_path="label_encoder.pkl", scaler_path="scaler.pkl"):
-    __device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    __model = SignWaveNetwork(19, 27)
+def load_model(model_path="signwave_model.pth", label_enc_path="label_encoder.pkl", scaler_path="scaler.pkl", device=None):
+    __device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
     __state = torch.load(model_path, map_location=__device)
+    # layer sizes come from the checkpoint rather than being hard-coded:
+    # 2-D weights are Linear layers, 1-D weights are LayerNorms
+    __linear = [w for k, w in __state.items() if k.endswith(".weight") and w.dim() == 2]
+    __n_norm = sum(1 for k, w in __state.items() if k.endswith(".weight") and w.dim() == 1)
+    __input_dim = __linear[0].shape[1]
+    __num_classes = __linear[-1].shape[0]
+    __hidden = tuple(w.shape[0] for w in __linear[:-1])
+    __model = SignWaveNetwork(__input_dim, __num_classes, hidden=__hidden, n_norm=__n_norm)
     __model.load_state_dict(__state)
+    __model.to(__device)
     __model.eval()
-    __scaler = joblib.load("scaler.pkl")               # StandardScaler/MinMaxScaler/Pipeline
-    __label_encoder = joblib.load("label_encoder.pkl") # sklearn LabelEncoder OR your own object/dict
+    __scaler = joblib.load(scaler_path)               # StandardScaler/MinMaxScaler/Pipeline
+    __label_encoder = joblib.load(label_enc_path)     # sklearn LabelEncoder OR your own object/dict
     return __model, __scaler, __label_encoder
 
 def predict(model, scaler, label_encoder, data_row, threshold=0.75):
@@ -182,6 +334,8 @@ def predict(model, scaler, label_encoder, data_row, threshold=0.75):
 # Visualization Script
 # ------------------------
 def visualize_network(input_dim=19, num_classes=27, output_file="network_visualization"):
+    from torchviz import make_dot
+
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model = SignWaveNetwork(input_dim, num_classes).to(device)
 
@@ -199,6 +353,8 @@ def visualize_network(input_dim=19, num_classes=27, output_file="network_visuali
     print(f"\nModel visualization saved as: {output_file}.png\n")
 
 if __name__=='__main__':
+    from icecream import ic
+
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
     parser = argparse.ArgumentParser()
@@ -210,6 +366,16 @@ if __name__=='__main__':
                         help="sets the number of epochs the model is trained for")
     parser.add_argument("--visualize", action='store_true',
                         help='visualize the model')
+    parser.add_argument("--data", action='store', default=DATA_PATH,
+                        help="recording csv or dataset.py directory (built and cached on first use)")
+    parser.add_argument("--patience", type=int, default=8,
+                        help="stop after this many epochs without validation improvement (0 = never)")
+    parser.add_argument("--resume", action='store_true',
+                        help="continue an interrupted run from the training checkpoint")
+    parser.add_argument("--checkpoint", action='store', default="signwave_train.ckpt",
+                        help="resumable checkpoint (model, optimizer, best weights, RNG) saved every epoch")
+    parser.add_argument("--cm-out", action='store', default=None,
+                        help="write the confusion matrix to this png (+ .csv/.txt) instead of showing it")
     args = parser.parse_args()
 
     BATCH_SIZE = 64 if torch.cuda.is_available() else 32
@@ -217,36 +383,25 @@ if __name__=='__main__':
     MODEL_LOAD_SUCCESS = False
     learning_rate = 1e-4
 
-    dataset_file = "sign_language_data_synth.csv"
+    dataset_file = args.data
     #dataset_file = "sign_language_data.csv"
 
-
-    df = pd.read_csv(dataset_file)
-    X = df.drop(columns=["label"]).values
-    input_dim = X.shape[1]
-    ic(input_dim)
-
-
-    df_train, df_temp = train_test_split(df, test_size=0.3, random_state=45, stratify=df["label"])  # stratify keeps class balance
-    ic(df_train)
-    ic(df_temp)
-    df_test, df_valid = train_test_split(df_temp, test_size=0.5, random_state=45, stratify=df_temp["label"])
-    df_train.to_csv("__train.csv", index=False)
-    df_test.to_csv("__test.csv", index=False)
-    df_valid.to_csv("__validate.csv", index=False)
-    
-    train_dataset = SignLanguageDataset("__train.csv", fit=True)
-    test_dataset = SignLanguageDataset("__test.csv", 
+    # the csv is parsed once into .npy memmaps with stratified 70/15/15 split indices (dataset.py)
+    train_dataset = SignLanguageDataset(dataset_file, split="train", fit=True)
+    test_dataset = SignLanguageDataset(dataset_file, split="test",
                                        scaler=train_dataset.scaler,
                                        label_encoder=train_dataset.label_encoder)
-    valid_dataset = SignLanguageDataset("__validate.csv", 
+    valid_dataset = SignLanguageDataset(dataset_file, split="val",
                                        scaler=train_dataset.scaler,
                                        label_encoder=train_dataset.label_encoder)
+    input_dim = train_dataset.X.shape[1]
+    ic(input_dim)
 
 
-    train_dataloader = DataLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True)
-    test_dataloader = DataLoader(test_dataset, batch_size=BATCH_SIZE, shuffle=True)
-    valid_dataloader = DataLoader(valid_dataset, batch_size=BATCH_SIZE, shuffle=True)
+    train_dataloader = TensorBatchLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True,
+                                         noise_std=TRAIN_NOISE_STD, device=device)
+    test_dataloader = TensorBatchLoader(test_dataset, batch_size=BATCH_SIZE, device=device)
+    valid_dataloader = TensorBatchLoader(valid_dataset, batch_size=BATCH_SIZE, device=device)
 
 
     ic(len(train_dataset.label_encoder.classes_))
@@ -263,8 +418,6 @@ if __name__=='__main__':
             ic(e)
             print(f"\n\npth file cannot be found at ./{MODEL_FILE}.pth\n\n")
 
-    loss_func = nn.CrossEntropyLoss()
-    optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate, weight_decay=1e-2)
     #optimizer = Lion(model.parameters(), lr=learning_rate, weight_decay=1e-2)
 
     if args.visualize:
@@ -273,22 +426,20 @@ if __name__=='__main__':
 
     epochs = int(args.epochs)
     if not (args.test and MODEL_LOAD_SUCCESS):
-        for t in range(epochs):
-            print(f"Epoch {t+1}\n--------------------------------------------")
-            train(train_dataloader, model, loss_func, optimizer)
-            validate(valid_dataloader, model, loss_func)
-
-
+        # AdamW, best-on-validation weights, early stop and a per-epoch resumable checkpoint
+        fit(model, train_dataloader, valid_dataloader, epochs, learning_rate, 1e-2,
+            patience=args.patience or None, checkpoint_path=args.checkpoint, resume=args.resume,
+            best_path=f"{MODEL_FILE}_best.pth")
 
-    print("Testing\n--------------------------------------------")
-    test(test_dataloader, model, train_dataset.label_encoder)
-    print("Done!")
-
-    # Save model + metadata
+    # Save model + metadata before testing, so a closed plot window or a crash loses nothing
     torch.save(model.state_dict(), "signwave_model.pth")   # save weights only
     joblib.dump(train_dataset.scaler, "scaler.pkl")
     joblib.dump(train_dataset.label_encoder, "label_encoder.pkl")
 
+    print("Testing\n--------------------------------------------")
+    test(test_dataloader, model, train_dataset.label_encoder, cm_file=args.cm_out)
+    print("Done!")
+
     print("\nSaved:")
     print(" - signwave_model.pth (model weights)")
     print(" - scaler.pkl (feature normalizer)")
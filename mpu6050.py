@@ -0,0 +1,213 @@
+"""
+2025 SignWave
+
+MPU-6050 driver with block reads.
+
+ACCEL_XOUT_H..GYRO_ZOUT_L (0x3B..0x48) are contiguous, so one 14-byte
+burst returns accel, temperature and gyro from the same sample instead of
+twelve single-byte transactions.
+
+For streaming, the on-chip FIFO is clocked by SMPLRT_DIV so the sample
+rate is set by the hardware; the host drains it in bulk and stamps the
+samples at 1/rate spacing.
+"""
+import struct
+import time
+
+import numpy as np
+from smbus2 import i2c_msg
+
+MPU6050_ADDR = 0x68
+
+# Registers
+PWR_MGMT_1   = 0x6B
+ACCEL_XOUT_H = 0x3B
+GYRO_XOUT_H  = 0x43
+
+# Registers used by FIFO streaming
+SMPLRT_DIV   = 0x19
+CONFIG       = 0x1A
+FIFO_EN      = 0x23
+INT_STATUS   = 0x3A
+USER_CTRL    = 0x6A
+FIFO_COUNTH  = 0x72
+FIFO_R_W     = 0x74
+
+FIFO_EN_ACCEL_GYRO = 0x78  # XG | YG | ZG | ACCEL
+USER_CTRL_FIFO_EN = 0x40
+USER_CTRL_FIFO_RESET = 0x04
+INT_STATUS_FIFO_OFLOW = 0x10
+FIFO_SIZE = 1024
+FIFO_FRAME_LEN = 12  # ax, ay, az, gx, gy, gz
+FIFO_RESYNC_S = 0.05  # re-anchor timestamps when they drift this far from the host clock
+
+ACCEL_SF = 16384.0   # LSB/g at +-2 g
+GYRO_SF  = 131.0     # LSB/(deg/s) at +-250 deg/s
+
+BLOCK_LEN = 14  # ax, ay, az, temp, gx, gy, gz as big-endian int16
+_BLOCK = struct.Struct(">7h")
+
+
+def temp_c(raw):
+    """Die temperature in degrees C from the raw TEMP_OUT word."""
+    return raw / 340.0 + 36.53
+
+
+class MPU6050:
+
+    def __init__(self, bus, addr=MPU6050_ADDR, accel_sf=ACCEL_SF, gyro_sf=GYRO_SF) -> None:
+        """Wrap an MPU-6050 on an open I2C bus
+
+        Parameters
+        ----------
+        bus : smbus2.SMBus
+            Open I2C bus
+        addr : Integer
+            7-bit device address (0x68, or 0x69 with AD0 high)
+        accel_sf : float
+            Accelerometer LSB per g for the configured range
+        gyro_sf : float
+            Gyroscope LSB per deg/s for the configured range
+        """
+        self.bus = bus
+        self.addr = addr
+        self.accel_sf = accel_sf
+        self.gyro_sf = gyro_sf
+
+    def setup(self):
+        """Wake the device (clear SLEEP)."""
+        self.bus.write_byte_data(self.addr, PWR_MGMT_1, 0x00)
+        time.sleep(0.05)
+
+    def read_raw(self):
+        """(ax, ay, az, temp, gx, gy, gz) raw int16 counts from one block read."""
+        block = self.bus.read_i2c_block_data(self.addr, ACCEL_XOUT_H, BLOCK_LEN)
+        return _BLOCK.unpack(bytes(block))
+
+    def read(self):
+        """(ax, ay, az) in g and (gx, gy, gz) in deg/s from one block read."""
+        ax, ay, az, _, gx, gy, gz = self.read_raw()
+        a, g = self.accel_sf, self.gyro_sf
+        return ax / a, ay / a, az / a, gx / g, gy / g, gz / g
+
+    def collect(self, duration, period=0.002):
+        """
+        Block-read samples for `duration` seconds into an (n, 7) float64 array
+        of raw counts (ax, ay, az, temp, gx, gy, gz).
+        """
+        rows = []
+        t_end = time.time() + duration
+        while time.time() < t_end:
+            rows.append(self.read_raw())
+            time.sleep(period)
+        if not rows:
+            rows.append(self.read_raw())
+        return np.asarray(rows, dtype=np.float64)
+
+    def temp_c(self, raw):
+        """Die temperature in degrees C from raw TEMP_OUT counts (scalar or array)."""
+        return temp_c(raw)
+
+    def scale(self, raw):
+        """Convert an (n, 7) raw array into (n, 6) [ax, ay, az, gx, gy, gz] in g and deg/s."""
+        raw = np.asarray(raw, dtype=np.float64)
+        out = np.empty(raw.shape[:-1] + (6,), dtype=np.float64)
+        out[..., :3] = raw[..., 0:3] / self.accel_sf
+        out[..., 3:] = raw[..., 4:7] / self.gyro_sf
+        return out
+
+    # ---------------------------
+    # FIFO streaming
+    # ---------------------------
+    def start_fifo(self, rate_hz=200.0, dlpf_cfg=3):
+        """Clock accel+gyro into the FIFO at `rate_hz` (DLPF on, so base rate is 1 kHz)
+
+        Parameters
+        ----------
+        rate_hz : float
+            Requested sample rate, 4..1000 Hz. The achieved rate is
+            1000 / (1 + SMPLRT_DIV) and is stored in `fifo_rate`.
+        dlpf_cfg : Integer (1..6)
+            Digital low-pass filter setting written to CONFIG
+        """
+        div = int(round(1000.0 / rate_hz)) - 1
+        div = max(0, min(255, div))
+        self.fifo_rate = 1000.0 / (1 + div)
+
+        self.bus.write_byte_data(self.addr, USER_CTRL, 0x00)
+        self.bus.write_byte_data(self.addr, CONFIG, dlpf_cfg & 0x07)
+        self.bus.write_byte_data(self.addr, SMPLRT_DIV, div)
+        self.bus.write_byte_data(self.addr, FIFO_EN, FIFO_EN_ACCEL_GYRO)
+        self.reset_fifo()
+
+    def reset_fifo(self):
+        """Flush the FIFO and restart the sample clock anchor."""
+        self.bus.write_byte_data(self.addr, USER_CTRL, USER_CTRL_FIFO_RESET)
+        self.bus.write_byte_data(self.addr, USER_CTRL, USER_CTRL_FIFO_EN)
+        self.bus.read_byte_data(self.addr, INT_STATUS)  # clear a stale overflow flag
+        self.__fifo_t0 = time.time()
+        self.__fifo_n = 0
+
+    def stop_fifo(self):
+        self.bus.write_byte_data(self.addr, USER_CTRL, 0x00)
+        self.bus.write_byte_data(self.addr, FIFO_EN, 0x00)
+
+    def fifo_count(self):
+        hi, lo = self.bus.read_i2c_block_data(self.addr, FIFO_COUNTH, 2)
+        return (hi << 8) | lo
+
+    def read_fifo(self):
+        """
+        Drain every complete frame from the FIFO in one transfer.
+        Returns (t, samples): t is (n,) evenly spaced host timestamps and
+        samples is (n, 6) [ax, ay, az, gx, gy, gz] in g and deg/s.
+        On overflow the FIFO is reset and nothing is returned.
+        """
+        count = self.fifo_count()
+        overflow = self.bus.read_byte_data(self.addr, INT_STATUS) & INT_STATUS_FIFO_OFLOW
+        if overflow or count >= FIFO_SIZE:
+            print("[WARN] MPU6050 FIFO overflow, resetting")
+            self.reset_fifo()
+            return np.empty(0), np.empty((0, 6))
+        n = count // FIFO_FRAME_LEN
+        if n == 0:
+            return np.empty(0), np.empty((0, 6))
+
+        write = i2c_msg.write(self.addr, [FIFO_R_W])
+        read = i2c_msg.read(self.addr, n * FIFO_FRAME_LEN)
+        self.bus.i2c_rdwr(write, read)
+        raw = np.frombuffer(bytes(read), dtype=">i2").reshape(n, 6)
+
+        samples = np.empty((n, 6), dtype=np.float64)
+        samples[:, :3] = raw[:, :3] / self.accel_sf
+        samples[:, 3:] = raw[:, 3:] / self.gyro_sf
+
+        period = 1.0 / self.fifo_rate
+        t = self.__fifo_t0 + (self.__fifo_n + 1 + np.arange(n)) * period
+        self.__fifo_n += n
+        # the newest frame was sampled "just now"; follow the host clock if the
+        # device oscillator has drifted, without breaking the even spacing
+        drift = time.time() - t[-1]
+        if abs(drift) > FIFO_RESYNC_S:
+            self.__fifo_t0 += drift
+            t += drift
+        return t, samples
+
+    def stream(self, rate_hz=200.0, poll_s=None):
+        """
+        Generator of (t, (ax, ay, az, gx, gy, gz)) at the hardware rate.
+        Polls the FIFO every `poll_s` (default: a quarter of the time the
+        FIFO takes to fill), so a stalled consumer only loses samples once
+        it falls a whole FIFO behind.
+        """
+        self.start_fifo(rate_hz)
+        if poll_s is None:
+            poll_s = (FIFO_SIZE // FIFO_FRAME_LEN) / self.fifo_rate / 4
+        try:
+            while True:
+                t, samples = self.read_fifo()
+                for ti, row in zip(t.tolist(), samples.tolist()):
+                    yield ti, tuple(row)
+                time.sleep(poll_s)
+        finally:
+            self.stop_fifo()
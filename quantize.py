@@ -0,0 +1,153 @@
+"""
+2025 SignWave
+
+Post-training int8 quantization of SignWaveNetwork.
+
+Every nn.Linear is dynamically quantized: weights are stored as int8 and
+activations are quantized per batch at run time, so no calibration set is
+needed and the LayerNorms stay in float. The script compares the float
+and int8 models on the held-out test split and writes a report; the
+inference service only picks the int8 model when the report says its
+accuracy drop is within tolerance. The report also records the sha256 of
+the checkpoint it was quantized from, so a retrained model is never
+served with a stale int8 copy.
+
+    python quantize.py                       # test split of model.DATA_PATH, 1 point tolerance
+    python quantize.py --tolerance 0.005 --data session.dataset --split val
+"""
+import argparse
+import hashlib
+import json
+import time
+
+import numpy as np
+import torch
+from torch import nn
+
+import dataset
+import model
+from inference import MODEL_PATH, LABEL_ENC_PATH, SCALER_PATH, QUANT_PATH, QUANT_REPORT_PATH as REPORT_PATH
+
+TOLERANCE = 0.01  # max allowed drop in test accuracy (fraction, not percent)
+
+
+def quantize(net):
+    """int8 dynamic-quantized copy of a float SignWaveNetwork."""
+    if "qnnpack" in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = "qnnpack"  # the ARM kernel set, so x86 numbers match the Pi
+    return torch.ao.quantization.quantize_dynamic(net.eval(), {nn.Linear}, dtype=torch.qint8)
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(model_path=MODEL_PATH, label_enc_path=LABEL_ENC_PATH, scaler_path=SCALER_PATH):
+    """sha256 of the three files a quantized model is derived from."""
+    return {"model": file_digest(model_path), "labels": file_digest(label_enc_path),
+            "scaler": file_digest(scaler_path)}
+
+
+def load_quantized(quant_path=QUANT_PATH, model_path=MODEL_PATH, label_enc_path=LABEL_ENC_PATH,
+                   scaler_path=SCALER_PATH):
+    """(int8 net, scaler, label_encoder) from a state_dict written by this script."""
+    net, scaler, label_encoder = model.load_model(model_path, label_enc_path, scaler_path,
+                                                  device=torch.device("cpu"))
+    qnet = quantize(net)  # same module structure, then overwrite with the saved int8 weights
+    qnet.load_state_dict(torch.load(quant_path, map_location="cpu"))
+    return qnet.eval(), scaler, label_encoder
+
+
+def accuracy(net, X, y):
+    with torch.inference_mode():
+        return float((net(torch.from_numpy(X)).argmax(dim=1).numpy() == y).mean())
+
+
+def latency_us(net, X, n=500):
+    """Mean microseconds per single-row forward pass."""
+    rows = [torch.from_numpy(X[i % len(X)][None, :]) for i in range(n)]
+    with torch.inference_mode():
+        for r in rows[:20]:
+            net(r)
+        t0 = time.perf_counter()
+        for r in rows:
+            net(r)
+    return 1e6 * (time.perf_counter() - t0) / n
+
+
+def compare(net, qnet, scaler, label_encoder, data_path, split="test"):
+    """Float vs int8 accuracy and latency on one split of the dataset the model was trained from."""
+    data = dataset.load(data_path)
+    rows = data.splits[split]
+    X = scaler.transform(np.asarray(data.X[rows], dtype=np.float32)).astype(np.float32)
+    y = label_encoder.transform(data.classes[data.y[rows]])
+    return {
+        "rows": len(X),
+        "float_acc": accuracy(net, X, y),
+        "int8_acc": accuracy(qnet, X, y),
+        "float_us": latency_us(net, X),
+        "int8_us": latency_us(qnet, X),
+    }
+
+
+def report_accepts(report_path=REPORT_PATH, tolerance=None, sources=None):
+    """
+    True when the saved report's accuracy drop is within `tolerance` (default:
+    the report's own) and, if `sources` (model, label encoder, scaler paths)
+    are given, the report was made from exactly those files.
+    """
+    try:
+        with open(report_path) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if sources is not None:
+        try:
+            current = fingerprint(*sources)
+        except OSError:
+            return False
+        if report.get("source") != current:
+            print(f"[WARN] {report_path} was not made from the current {sources[0]}; re-run quantize.py")
+            return False
+    if tolerance is None:
+        tolerance = report["tolerance"]
+    return report["float_acc"] - report["int8_acc"] <= tolerance
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--labels", default=LABEL_ENC_PATH)
+    parser.add_argument("--out", default=QUANT_PATH)
+    parser.add_argument("--data", default=model.DATA_PATH,
+                        help="training recording csv or dataset.py directory (same as model.py --data)")
+    parser.add_argument("--split", default="test", choices=dataset.SPLITS, help="held-out split to compare on")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="max accuracy drop (fraction) for the int8 model to be accepted")
+    parser.add_argument("--report", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    net, scaler, label_encoder = model.load_model(args.model, args.labels, args.scaler,
+                                                  device=torch.device("cpu"))
+    qnet = quantize(net)
+    torch.save(qnet.state_dict(), args.out)
+
+    report = compare(net, qnet, scaler, label_encoder, args.data, args.split)
+    report.update(tolerance=args.tolerance, model=args.model, quantized=args.out, data=args.data, split=args.split,
+                  source=fingerprint(args.model, args.labels, args.scaler),
+                  accepted=report["float_acc"] - report["int8_acc"] <= args.tolerance)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{args.split} split of {args.data} ({report['rows']} rows)")
+    print(f"  float32: {100 * report['float_acc']:6.2f}%  {report['float_us']:8.1f} us/sample")
+    print(f"  int8:    {100 * report['int8_acc']:6.2f}%  {report['int8_us']:8.1f} us/sample")
+    print(f"  accuracy drop {100 * (report['float_acc'] - report['int8_acc']):.2f} points, "
+          f"tolerance {100 * args.tolerance:.2f} -> {'ACCEPTED' if report['accepted'] else 'REJECTED'}")
+    print(f"\nSaved {args.out} and {args.report}\n")
@@ -0,0 +1,249 @@
+"""
+2025 SignWave
+
+Torch-free runtimes for an exported SignWaveNetwork.
+
+export_model.py writes the network with the scaler already folded into
+the first layer, plus the class labels, as either
+
+  * signwave_model.npz  - layer list + weights, evaluated here with NumPy
+  * signwave_model.onnx - evaluated with onnxruntime when it is installed
+
+Both engines expose the same interface as inference.FusedEngine
+(classes, input_dim, predict, predict_proba, predict_batch), so
+InferenceService can serve whichever artifact is present without
+importing torch.
+
+StreamingGRU runs the temporal model (temporal_model.py) one frame at a
+time from a carried hidden state.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+ARTIFACT_VERSION = 1
+TEMPORAL_VERSION = 1
+
+# op codes stored in the npz "ops" array
+OP_LINEAR = "linear"
+OP_RELU = "relu"
+OP_NORM = "norm"  # LayerNorm without affine; gamma/beta are folded into the next linear
+
+
+def softmax(z):
+    z = z - z.max(axis=-1, keepdims=True)
+    np.exp(z, out=z)
+    z /= z.sum(axis=-1, keepdims=True)
+    return z
+
+
+class NumpyEngine:
+
+    def __init__(self, path, stamp=None) -> None:
+        """Evaluate an exported .npz network with NumPy
+
+        Parameters
+        ----------
+        path : str
+            Artifact written by export_model.py
+        stamp : tuple, optional
+            Artifact file mtime this engine was built from
+        """
+        with np.load(path, allow_pickle=False) as z:
+            version = int(z["version"])
+            if version != ARTIFACT_VERSION:
+                raise ValueError(f"{path}: artifact version {version}, expected {ARTIFACT_VERSION}")
+            self.classes = z["classes"]
+            self.ops = []
+            for i, op in enumerate(z["ops"].tolist()):
+                if op == OP_LINEAR:
+                    # stored (in, out) so rows multiply on the left without a transpose
+                    self.ops.append((op, np.ascontiguousarray(z[f"w{i}"], dtype=np.float32),
+                                     np.asarray(z[f"b{i}"], dtype=np.float32)))
+                elif op == OP_NORM:
+                    self.ops.append((op, float(z[f"eps{i}"])))
+                elif op == OP_RELU:
+                    self.ops.append((op,))
+                else:
+                    raise ValueError(f"{path}: unknown op {op!r}")
+        self.input_dim = self.ops[0][1].shape[0]
+        self.stamp = stamp
+
+    def logits(self, X):
+        h = np.asarray(X, dtype=np.float32).reshape(-1, self.input_dim)
+        for op in self.ops:
+            if op[0] == OP_LINEAR:
+                h = h @ op[1]
+                h += op[2]
+            elif op[0] == OP_RELU:
+                np.maximum(h, 0.0, out=h)
+            else:
+                mu = h.mean(axis=1, keepdims=True)
+                h = h - mu
+                var = np.mean(h * h, axis=1, keepdims=True)
+                h /= np.sqrt(var + op[1])
+        return h
+
+    def predict_proba(self, X):
+        """(n, n_features) raw (unscaled) features -> (n, n_classes) probabilities."""
+        return softmax(self.logits(X))
+
+    def predict_batch(self, X):
+        """Returns (labels (n,), probs (n, n_classes)) for raw feature rows X."""
+        probs = self.predict_proba(X)
+        return self.classes[probs.argmax(axis=1)], probs
+
+    def predict(self, data_row):
+        """(label, confidence) for one raw feature row."""
+        probs = self.predict_proba(data_row)[0]
+        idx = int(probs.argmax())
+        return self.classes[idx], float(probs[idx])
+
+
+class OnnxEngine:
+
+    def __init__(self, path, stamp=None) -> None:
+        """Evaluate an exported .onnx network with onnxruntime on the CPU"""
+        if onnxruntime is None:
+            raise ImportError("onnxruntime is not installed")
+        opts = onnxruntime.SessionOptions()
+        opts.intra_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.classes = np.asarray(json.loads(meta["classes"]))
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.input_dim = inp.shape[1]
+        self.stamp = stamp
+        self.__lock = threading.Lock()
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.input_dim)
+        with self.__lock:
+            logits = self.session.run(None, {self.input_name: X})[0]
+        return softmax(logits)
+
+    def predict_batch(self, X):
+        probs = self.predict_proba(X)
+        return self.classes[probs.argmax(axis=1)], probs
+
+    def predict(self, data_row):
+        probs = self.predict_proba(data_row)[0]
+        idx = int(probs.argmax())
+        return self.classes[idx], float(probs[idx])
+
+
+def _sigmoid(x, out):
+    np.negative(x, out=out)
+    np.exp(out, out=out)
+    out += 1.0
+    np.reciprocal(out, out=out)
+    return out
+
+
+class StreamingGRU:
+
+    def __init__(self, path) -> None:
+        """Frame-by-frame GRU classifier exported by temporal_model.py
+
+        Parameters
+        ----------
+        path : str
+            signwave_temporal.npz (scaler folded into W_ih)
+        """
+        with np.load(path, allow_pickle=False) as z:
+            version = int(z["version"])
+            if version != TEMPORAL_VERSION:
+                raise ValueError(f"{path}: temporal version {version}, expected {TEMPORAL_VERSION}")
+            self.classes = z["classes"]
+            # the hidden state's dynamics only mean anything when stepped at the training frame rate
+            self.frame_hz = float(z["frame_hz"]) if "frame_hz" in z.files else None
+            # transposed once so a row vector multiplies on the left
+            self.W_ih = np.ascontiguousarray(z["W_ih"].T)
+            self.W_hh = np.ascontiguousarray(z["W_hh"].T)
+            self.b_ih = z["b_ih"]
+            self.b_hh = z["b_hh"]
+            self.W_out = np.ascontiguousarray(z["W_out"].T)
+            self.b_out = z["b_out"]
+        self.input_dim = self.W_ih.shape[0]
+        self.hidden = self.W_hh.shape[0]
+        H = self.hidden
+        self.h = np.zeros(H, dtype=np.float32)
+        # preallocated per-step scratch
+        self.__gi = np.empty(3 * H, dtype=np.float32)
+        self.__gh = np.empty(3 * H, dtype=np.float32)
+        self.__rz = np.empty(2 * H, dtype=np.float32)
+        self.__n = np.empty(H, dtype=np.float32)
+        self.__x = np.empty(self.input_dim, dtype=np.float32)
+        self.__logits = np.empty(len(self.classes), dtype=np.float32)
+
+    def reset(self):
+        """Forget the motion history (start of a session)."""
+        self.h.fill(0.0)
+
+    def step(self, data_row):
+        """
+        Advance one frame. Returns (label, confidence, probs); probs is a
+        view that the next step overwrites.
+        PyTorch gate order r, z, n:
+            r, z = sigmoid(W_i x + b_i + W_h h + b_h)
+            n = tanh(W_in x + b_in + r * (W_hn h + b_hn))
+            h = (1 - z) * n + z * h
+        """
+        H = self.hidden
+        self.__x[:] = data_row
+        gi, gh, rz, n = self.__gi, self.__gh, self.__rz, self.__n
+        np.dot(self.__x, self.W_ih, out=gi)
+        gi += self.b_ih
+        np.dot(self.h, self.W_hh, out=gh)
+        gh += self.b_hh
+        np.add(gi[:2 * H], gh[:2 * H], out=rz)
+        _sigmoid(rz, rz)
+        r, z = rz[:H], rz[H:]
+        np.multiply(r, gh[2 * H:], out=n)
+        n += gi[2 * H:]
+        np.tanh(n, out=n)
+        # h = n + z * (h - n)
+        self.h -= n
+        self.h *= z
+        self.h += n
+
+        logits = self.__logits
+        np.dot(self.h, self.W_out, out=logits)
+        logits += self.b_out
+        probs = softmax(logits[None, :])[0]
+        idx = int(probs.argmax())
+        return self.classes[idx], float(probs[idx]), probs
+
+
+def artifact_source(path):
+    """
+    (model, labels, scaler) mtime_ns recorded by export_model.py, or None
+    for an artifact exported before they were recorded.
+    """
+    try:
+        if path.endswith(".onnx"):
+            if onnxruntime is None:
+                return None
+            session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+            value = session.get_modelmeta().custom_metadata_map.get("source_mtime")
+            return tuple(json.loads(value)) if value else None
+        with np.load(path, allow_pickle=False) as z:
+            return tuple(int(v) for v in z["source_mtime"]) if "source_mtime" in z.files else None
+    except (OSError, ValueError):
+        return None
+
+
+def load_artifact(path):
+    """NumpyEngine or OnnxEngine for an exported artifact, by extension."""
+    stamp = (os.stat(path).st_mtime_ns,)
+    if path.endswith(".onnx"):
+        return OnnxEngine(path, stamp=stamp)
+    return NumpyEngine(path, stamp=stamp)
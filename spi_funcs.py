@@ -1,22 +1,41 @@
 """
 2025 SignWave
 """
-import spidev
-import lgpio as gpio
 import time
 
-__SPI_BUS_SPEED__ = 1 #3_600_000 #Hz (3.6 MHz) constrained by ADC
+try:
+    import spidev
+except ImportError:  # dev machines; use MockSpiDev
+    spidev = None
+try:
+    import lgpio as gpio
+except ImportError:
+    gpio = None
+
+__SPI_BUS_SPEED__ = 1_350_000 #Hz (1.35 MHz) MCP3008 limit at 3.3 V; BMI323 allows up to 10 MHz
+
+
+def _delay(seconds):
+    """Busy-wait for short CS setup/hold times; time.sleep cannot go below tens of us."""
+    if seconds <= 0:
+        return
+    end = time.perf_counter_ns() + int(seconds * 1e9)
+    while time.perf_counter_ns() < end:
+        pass
 
 
 class SPI_DEVICE:
 
-    def __init__(self, DEVICE_CS_PIN : int, SPI_BUS=0, SPI_DEVICE=0, SPI_MODE=0b00, SPI_SPEED=__SPI_BUS_SPEED__) -> None:
+    def __init__(self, DEVICE_CS_PIN=None, SPI_BUS=0, SPI_DEVICE=0, SPI_MODE=0b00, SPI_SPEED=__SPI_BUS_SPEED__,
+                 CS_SETUP=0.0, CS_HOLD=0.0, backend=None) -> None:
         """Initialize the SPI device
 
         Parameters
         ----------
-        DEVICE_CS_PIN : Integer
-            GPIO pin used as chip select
+        DEVICE_CS_PIN : Integer or None
+            GPIO pin used as a software chip select. None uses the
+            controller's hardware CS (CE0/CE1 picked by SPI_DEVICE), which
+            needs no GPIO traffic and holds CS across a whole transfer.
         SPI_BUS : Integer (0 or 1)
             SPI bus number
         SPI_DEVICE : Integer (0 or 1)
@@ -34,28 +53,40 @@ class SPI_DEVICE:
         SPI_SPEED : Hz
             Clocking speed of the serial interface.
             Frequency of SCLK
+        CS_SETUP : seconds
+            Software CS only: delay between asserting CS and the first clock
+        CS_HOLD : seconds
+            Software CS only: delay between the last clock and releasing CS
+        backend : object with xfer2/close, optional
+            Use this instead of opening spidev (e.g. MockSpiDev)
         """
         self.cs = DEVICE_CS_PIN
         self.spi_bus = SPI_BUS
         self.spi_device = SPI_DEVICE
         self.interface_freq = SPI_SPEED
         self.mode = SPI_MODE
+        self.cs_setup = CS_SETUP
+        self.cs_hold = CS_HOLD
 
-        self.spi = None
+        self.spi = backend
         self.gpio_chip = None
 
-        self.__initialize_gpio()
-        self.__initialize_spi()
+        if self.cs is not None and backend is None:
+            self.__initialize_gpio()
+        if self.spi is None:
+            self.__initialize_spi()
 
 
     def __initialize_spi(self):
-        """[TODO:description]"""
+        """Open the spidev node and apply mode/clock settings."""
         self.spi = spidev.SpiDev()
         self.spi.open(self.spi_bus, self.spi_device)
         self.spi.mode = self.mode
         self.spi.max_speed_hz = self.interface_freq
         self.spi.lsbfirst = False # MSB-first transmission
         self.spi.cshigh = False # Active low CS
+        if self.cs is not None:
+            self.spi.no_cs = True # CS is driven through GPIO instead
 
     def __initialize_gpio(self):
         """
@@ -65,37 +96,51 @@ class SPI_DEVICE:
         gpio.gpio_claim_output(self.gpio_chip, self.cs) # set CS pin as output
         gpio.gpio_write(self.gpio_chip, self.cs, 1) # Ensure CS is high
 
+    def transfer(self, data):
+        """Clock `data` out in one CS-framed transaction and return the bytes clocked in"""
+        if self.gpio_chip is None:
+            return self.spi.xfer2(data)
+
+        gpio.gpio_write(self.gpio_chip, self.cs, 0) # Activate CS (LOW)
+        _delay(self.cs_setup)
+        response = self.spi.xfer2(data)
+        _delay(self.cs_hold)
+        gpio.gpio_write(self.gpio_chip, self.cs, 1) # Deactivate CS (HIGH)
+        return response
+
     def read_register(self, register_addr):
-        """[TODO:description]
+        """Read one register byte; returns the raw [address echo, data] response
 
         Parameters
         ----------
         register_addr : Hexadecimal
             Address of the desired register in hexadecimal
         """
-        # Pull GPIO down to start read operation
-        gpio.gpio_write(self.gpio_chip, self.cs, 0) # Activate CS (LOW)
-        time.sleep(1e-3)
-
         address = register_addr | 0x80 # set MSB to 1 (read operation)
         dummy_byte = 0x00
-        response = self.spi.xfer2([address, dummy_byte])
+        return self.transfer([address, dummy_byte])
 
-        # Release Slave (Pull it high)
-        time.sleep(1e-3)
-        gpio.gpio_write(self.gpio_chip, self.cs, 1) # Deactivate CS (HIGH)
+    def write_register(self, register_addr, value):
+        address = register_addr & 0x7F
+        self.transfer([address, value])  # Send address & data
 
-        return response
+    def read_registers(self, register_addr, length):
+        """Burst read `length` bytes starting at register_addr in one transfer
 
-    def write_register(self, register_addr, value):
-        gpio.gpio_write(self.gpio_chip, self.cs, 0) # Activate CS (LOW)
-        time.sleep(1e-3)
+        Parameters
+        ----------
+        register_addr : Hexadecimal
+            Address of the first register
+        length : Integer
+            Number of bytes clocked out after the address byte
+        """
+        address = register_addr | 0x80 # set MSB to 1 (read operation)
+        return self.transfer([address] + [0x00] * length)[1:]
 
+    def write_registers(self, register_addr, values):
+        """Burst write `values` starting at register_addr in one transfer"""
         address = register_addr & 0x7F
-        self.spi.xfer2([address, value])  # Send address & data
-
-        time.sleep(1e-3)
-        gpio.gpio_write(self.gpio_chip, self.cs, 1) # Deactivate CS (HIGH)
+        self.transfer([address] + list(values))
 
     def close(self):
         if self.spi:
@@ -105,6 +150,58 @@ class SPI_DEVICE:
 
     def __enter__(self):
         return self
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+class MockSpiDev:
+    """
+    In-memory spidev stand-in with an auto-incrementing register file.
+    Counts transactions and bytes so register throughput can be measured
+    without hardware.
+    """
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(256)
+        for addr, value in (registers or {}).items():
+            self.registers[addr] = value
+        self.transactions = 0
+        self.bytes = 0
+        self.max_speed_hz = __SPI_BUS_SPEED__
+
+    def xfer2(self, data):
+        self.transactions += 1
+        self.bytes += len(data)
+        addr = data[0] & 0x7F
+        payload = data[1:]
+        if data[0] & 0x80:
+            return [0x00] + [self.registers[(addr + i) & 0xFF] for i in range(len(payload))]
+        for i, value in enumerate(payload):
+            self.registers[(addr + i) & 0xFF] = value
+        return [0x00] * len(data)
+
+    def close(self):
+        pass
+
+
+if __name__ == "__main__":
+    N = 20_000
+    mock = MockSpiDev({0x00: 0x43})
+    dev = SPI_DEVICE(backend=mock)
+
+    t0 = time.perf_counter()
+    for _ in range(N):
+        dev.read_register(0x00)
+    dt = time.perf_counter() - t0
+    print(f"single register reads: {N / dt:,.0f} ops/s")
+
+    mock.transactions = 0
+    t0 = time.perf_counter()
+    for _ in range(N):
+        dev.read_registers(0x03, 14)
+    dt = time.perf_counter() - t0
+    print(f"14-byte burst reads:   {N / dt:,.0f} ops/s ({mock.transactions / N:.0f} transaction each)")
+
+    # bytes on the wire per second at the configured clock, for comparison
+    print(f"bus limit at {__SPI_BUS_SPEED__ / 1e6:.2f} MHz: {__SPI_BUS_SPEED__ / 8 / 15:,.0f} 15-byte transfers/s")
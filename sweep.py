@@ -0,0 +1,164 @@
+"""
+2025 SignWave
+
+Parallel hyperparameter sweep for SignWaveNetwork.
+
+Candidates come from a grid (every combination) or a random sample of it,
+and each is trained in its own worker process with a fixed torch thread
+count, so N cores run N / threads candidates at once without
+oversubscribing. Results are appended to a leaderboard CSV as they
+finish, sorted by validation accuracy at the end.
+
+    python sweep.py                                   # DEFAULT_SPEC grid
+    python sweep.py --spec sweep.json --random 20 --epochs 15
+    python sweep.py --set width=128,256 --set lr=1e-3,3e-4
+
+Spec keys (lists of values): width, depth, dropout, n_norm, lr,
+weight_decay, noise_std, batch_size. Hidden layers taper by half from
+`width` for `depth` layers, so width=256, depth=4 is the shipped network.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+DEFAULT_SPEC = {
+    "width": [128, 256, 512],
+    "depth": [2, 3, 4],
+    "dropout": [0.1, 0.3],
+    "n_norm": [2],
+    "lr": [1e-3, 1e-4],
+    "weight_decay": [1e-2],
+    "noise_std": [0.02],
+    "batch_size": [32],
+}
+LEADERBOARD = "sweep_results.csv"
+COLUMNS = ["val_acc", "val_loss", "latency_us", "params", "train_s",
+           "width", "depth", "hidden", "dropout", "n_norm", "lr", "weight_decay", "noise_std", "batch_size", "error"]
+
+
+def hidden_layers(width, depth):
+    return tuple(max(width >> i, 8) for i in range(depth))
+
+
+def candidates(spec, n_random=None, seed=0):
+    keys = sorted(spec)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(spec[k] for k in keys))]
+    if n_random is not None and n_random < len(grid):
+        grid = random.Random(seed).sample(grid, n_random)
+    return grid
+
+
+def _init_worker(threads):
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def run_candidate(config, data, epochs, seed, patience=None):
+    """Train one config in a worker; returns a leaderboard row."""
+    import numpy as np
+    import torch
+    import model
+
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    row = dict(config, hidden="-".join(map(str, hidden_layers(config["width"], config["depth"]))))
+    try:
+        train_ds = model.SignLanguageDataset(data, split="train", fit=True)
+        valid_ds = model.SignLanguageDataset(data, split="val", scaler=train_ds.scaler,
+                                             label_encoder=train_ds.label_encoder)
+        net = model.SignWaveNetwork(train_ds.X.shape[1], len(train_ds.label_encoder.classes_),
+                                    hidden=hidden_layers(config["width"], config["depth"]),
+                                    dropout=config["dropout"], n_norm=config["n_norm"])
+        train_dl = model.TensorBatchLoader(train_ds, batch_size=config["batch_size"], shuffle=True,
+                                           noise_std=config["noise_std"])
+        valid_dl = model.TensorBatchLoader(valid_ds, batch_size=1024)
+
+        t0 = time.perf_counter()
+        val_loss, val_acc = model.fit(net, train_dl, valid_dl, epochs, config["lr"], config["weight_decay"],
+                                      verbose=False, patience=patience)
+        row["train_s"] = round(time.perf_counter() - t0, 1)
+
+        net.eval()
+        x = valid_ds.X[:1]
+        with torch.inference_mode():
+            for _ in range(50):
+                net(x)
+            t0 = time.perf_counter()
+            for _ in range(500):
+                net(x)
+        row["latency_us"] = round(1e6 * (time.perf_counter() - t0) / 500, 1)
+        row["params"] = sum(p.numel() for p in net.parameters())
+        row["val_acc"] = round(val_acc, 5)
+        row["val_loss"] = round(val_loss, 5)
+    except Exception as e:
+        row["error"] = repr(e)
+    return row
+
+
+def write_leaderboard(rows, path):
+    rows = sorted(rows, key=lambda r: (-r.get("val_acc", -1), r.get("latency_us", float("inf"))))
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="sign_language_data_synth.csv",
+                        help="recording csv or dataset.py directory")
+    parser.add_argument("--spec", default=None, help="json file of {param: [values]} (overrides the defaults)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=V1,V2",
+                        help="override one spec entry")
+    parser.add_argument("--random", type=int, default=None, help="sample this many candidates from the grid")
+    parser.add_argument("--epochs", type=int, default=35)
+    parser.add_argument("--patience", type=int, default=None, help="early-stop each candidate (model.fit)")
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    parser.add_argument("--workers", type=int, default=None, help="default: cpu count / threads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=LEADERBOARD)
+    args = parser.parse_args()
+
+    spec = dict(DEFAULT_SPEC)
+    if args.spec:
+        with open(args.spec) as f:
+            spec.update(json.load(f))
+    for item in args.set:
+        key, values = item.split("=", 1)
+        cast = type(DEFAULT_SPEC[key][0]) if key in DEFAULT_SPEC else float
+        spec[key] = [cast(v) for v in values.split(",")]
+
+    import dataset
+    data = dataset.ensure_built(args.data)  # build once here, not in every worker
+
+    configs = candidates(spec, args.random, args.seed)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+    print(f"{len(configs)} candidates, {workers} workers x {args.threads} thread(s), {args.epochs} epochs")
+
+    rows = []
+    t0 = time.perf_counter()
+    # spawn: forked children would inherit torch's thread pools from the parent
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(args.threads,)) as pool:
+        futures = [pool.submit(run_candidate, c, data, args.epochs, args.seed, args.patience) for c in configs]
+        for i, fut in enumerate(as_completed(futures), 1):
+            row = fut.result()
+            rows.append(row)
+            write_leaderboard(rows, args.out)
+            status = row.get("error") or f"val {100 * row['val_acc']:.2f}%  {row['latency_us']} us  {row['params']} params"
+            print(f"[{i}/{len(configs)}] hidden={row['hidden']} dropout={row['dropout']} lr={row['lr']}: {status}")
+
+    rows = write_leaderboard(rows, args.out)
+    print(f"\nDone in {time.perf_counter() - t0:.0f}s, leaderboard in {args.out}")
+    for r in rows[:5]:
+        if "val_acc" in r:
+            print(f"  {100 * r['val_acc']:6.2f}%  {r['latency_us']:7.1f} us  {r['params']:8d}  hidden={r['hidden']} "
+                  f"dropout={r['dropout']} lr={r['lr']} wd={r['weight_decay']} noise={r['noise_std']}")
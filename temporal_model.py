@@ -0,0 +1,169 @@
+"""
+2025 SignWave
+
+Streaming sequence classifier for the motion letters (J, Z).
+
+SignWaveNetwork sees one frame at a time, so a letter defined by its
+motion has to be guessed from a static pose. TemporalGRU is a small
+one-layer GRU with per-frame outputs. It is trained on sequences that
+splice together contiguous same-label runs from the recordings, so it
+learns both the motion and the transitions between letters. Because of
+that it can run indefinitely from a carried hidden state: each new frame
+costs one GRU step, not a pass over a window.
+
+    python temporal_model.py --data sign_language_data_synth.csv
+
+writes signwave_temporal.npz. It contains the scaler-folded GRU weights,
+the class labels and the frame rate of the recordings, and is evaluated
+on the glove by runtime.StreamingGRU without torch. The GRU learns motion
+per frame, so it is only valid in a loop stepping it at that same rate.
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from torch import nn
+
+from runtime import TEMPORAL_VERSION
+
+TEMPORAL_PATH = "signwave_temporal.npz"
+MOTION_LETTERS = ("J", "Z")
+HIDDEN = 64
+SEQ_LEN = 64                # frames per training sequence
+RUN_MIN, RUN_MAX = 8, 32    # frames taken from each spliced run
+FRAME_HZ = 30               # gather_data2.SAMPLE_HZ, the rate the recordings are sampled at
+
+
+class TemporalGRU(nn.Module):
+    def __init__(self, input_dim, num_classes, hidden=HIDDEN):
+        super(TemporalGRU, self).__init__()
+        self.gru = nn.GRU(input_dim, hidden, batch_first=True)
+        self.head = nn.Linear(hidden, num_classes)
+
+    def forward(self, x, h=None):
+        """x: (batch, time, features) -> logits (batch, time, classes), final hidden state"""
+        out, h = self.gru(x, h)
+        return self.head(out), h
+
+
+def make_sequences(X, y, runs, n, seq_len=SEQ_LEN, rng=None):
+    """n sequences of seq_len frames, each a splice of random chunks of random runs."""
+    rng = rng or np.random.default_rng()
+    Xs = np.empty((n, seq_len, X.shape[1]), dtype=np.float32)
+    ys = np.empty((n, seq_len), dtype=np.int64)
+    for i in range(n):
+        t = 0
+        while t < seq_len:
+            start, end = runs[rng.integers(len(runs))]
+            length = min(int(rng.integers(RUN_MIN, RUN_MAX + 1)), end - start, seq_len - t)
+            offset = start + int(rng.integers(0, end - start - length + 1))
+            Xs[i, t:t + length] = X[offset:offset + length]
+            ys[i, t:t + length] = y[offset:offset + length]
+            t += length
+    return torch.from_numpy(Xs), torch.from_numpy(ys)
+
+
+def frame_accuracy(net, X, y, classes):
+    """Overall per-frame accuracy and recall of each motion letter."""
+    with torch.inference_mode():
+        pred = net(X)[0].argmax(dim=2)
+    acc = float((pred == y).float().mean())
+    recall = {}
+    for letter in MOTION_LETTERS:
+        if letter in classes:
+            mask = y == classes.index(letter)
+            recall[letter] = float((pred[mask] == y[mask]).float().mean()) if mask.any() else float("nan")
+    return acc, recall
+
+
+def export_npz(net, mean, scale, classes, path=TEMPORAL_PATH, frame_hz=FRAME_HZ):
+    """GRU + head weights with the standardization folded into the input weights."""
+    W_ih = net.gru.weight_ih_l0.detach().double().numpy()
+    b_ih = net.gru.bias_ih_l0.detach().double().numpy()
+    a, c = 1.0 / scale, -mean / scale
+    np.savez(path,
+             version=np.int32(TEMPORAL_VERSION),
+             classes=np.asarray(classes).astype(str),
+             frame_hz=np.float64(frame_hz),
+             W_ih=(W_ih * a).astype(np.float32),
+             b_ih=(b_ih + W_ih @ c).astype(np.float32),
+             W_hh=net.gru.weight_hh_l0.detach().numpy().astype(np.float32),
+             b_hh=net.gru.bias_hh_l0.detach().numpy().astype(np.float32),
+             W_out=net.head.weight.detach().numpy().astype(np.float32),
+             b_out=net.head.bias.detach().numpy().astype(np.float32))
+    return path
+
+
+if __name__ == "__main__":
+    import dataset
+    from runtime import StreamingGRU
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="sign_language_data_synth.csv",
+                        help="recording csv or dataset.py directory, rows in recording order")
+    parser.add_argument("--epochs", type=int, default=40)
+    parser.add_argument("--hidden", type=int, default=HIDDEN)
+    parser.add_argument("--seq-len", type=int, default=SEQ_LEN)
+    parser.add_argument("--batches", type=int, default=50, help="batches of 32 sequences per epoch")
+    parser.add_argument("--lr", type=float, default=3e-3)
+    parser.add_argument("--seed", type=int, default=45)
+    parser.add_argument("--hz", type=float, default=FRAME_HZ,
+                        help="frame rate of the recordings; the GRU must be stepped at this rate")
+    parser.add_argument("--out", default=TEMPORAL_PATH)
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    data = dataset.load(args.data)
+    X = np.asarray(data.X, dtype=np.float32)
+    y = np.asarray(data.y, dtype=np.int64)
+    classes = data.classes.tolist()
+
+    # hold out whole runs (not rows), otherwise validation frames sit inside training chunks
+    runs = dataset.label_runs(y)
+    order = rng.permutation(len(runs))
+    n_val = max(1, len(runs) // 6)
+    val_runs = [runs[i] for i in order[:n_val]]
+    train_runs = [runs[i] for i in order[n_val:]]
+    train_rows = np.concatenate([np.arange(s, e) for s, e in train_runs])
+    mean = X[train_rows].mean(axis=0).astype(np.float64)
+    scale = X[train_rows].std(axis=0).astype(np.float64)
+    scale[scale == 0] = 1.0
+    Xn = ((X - mean) / scale).astype(np.float32)
+    print(f"{len(runs)} runs ({len(train_runs)} train / {len(val_runs)} val), {len(classes)} classes")
+
+    net = TemporalGRU(X.shape[1], len(classes), args.hidden)
+    optimizer = torch.optim.AdamW(net.parameters(), lr=args.lr, weight_decay=1e-2)
+    loss_func = nn.CrossEntropyLoss()
+    val_X, val_y = make_sequences(Xn, y, val_runs, 256, args.seq_len, rng)
+
+    for epoch in range(args.epochs):
+        net.train()
+        t0 = time.perf_counter()
+        for _ in range(args.batches):
+            xb, yb = make_sequences(Xn, y, train_runs, 32, args.seq_len, rng)
+            xb = xb + 0.02 * torch.randn_like(xb)
+            optimizer.zero_grad()
+            logits, _ = net(xb)
+            loss = loss_func(logits.reshape(-1, len(classes)), yb.reshape(-1))
+            loss.backward()
+            optimizer.step()
+        net.eval()
+        acc, recall = frame_accuracy(net, val_X, val_y, classes)
+        motion = "  ".join(f"{k} recall {100 * v:.1f}%" for k, v in recall.items())
+        print(f"Epoch {epoch + 1}: loss {loss.item():.4f}  val frame acc {100 * acc:.1f}%  {motion}  "
+              f"({time.perf_counter() - t0:.1f}s)")
+
+    export_npz(net, mean, scale, classes, args.out, args.hz)
+
+    # the streaming runtime must match torch frame for frame on raw (unscaled) input
+    stream = StreamingGRU(args.out)
+    raw = val_X[0].numpy() * scale.astype(np.float32) + mean.astype(np.float32)
+    with torch.inference_mode():
+        ref = torch.softmax(net(val_X[:1])[0][0], dim=1).numpy()
+    t0 = time.perf_counter()
+    probs = np.stack([stream.step(row)[2].copy() for row in raw])
+    step_us = 1e6 * (time.perf_counter() - t0) / len(raw)
+    print(f"Saved {args.out}; streaming max |dp| vs torch {np.abs(probs - ref).max():.2e}, "
+          f"{step_us:.1f} us/frame")